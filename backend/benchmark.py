@@ -0,0 +1,353 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from functools import partial
+
+import pandas as pd
+
+import numpy as np
+
+from process import (
+    EMPTY, ProblemData, ProblemSnapshot, GreyWolfOptimizer, FitnessTracker, ScheduleJournal,
+    create_random_schedule, collect_conflicts, calculate_fitness, free_block_starts,
+    schedule_fingerprint
+)
+
+# Ukuran instance bawaan; jumlah "courses" = baris data_dosen (dosen x mk x kelas)
+SIZES = {
+    "small": dict(n_dosen=20, n_courses=40, n_rooms=5, n_days=5, n_jam=10),
+    "medium": dict(n_dosen=40, n_courses=100, n_rooms=8, n_days=6, n_jam=12),
+    "large": dict(n_dosen=80, n_courses=250, n_rooms=15, n_days=6, n_jam=14),
+}
+
+DAY_NAMES = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+
+def generate_instance(n_dosen, n_courses, n_rooms, n_days, n_jam, preference_density=0.2, seed=0,
+                      jam_minutes=50):
+    # Instance sintetis tanpa database: tabel master dengan kolom yang sama
+    # seperti model, ditambah preferensi dosen/prodi sebanyak preference_density.
+    # jam_minutes > 50 membuat jam yang berurutan saling beririsan.
+    rng = random.Random(seed)
+    dosen_df = pd.DataFrame({
+        "id_dosen": range(1, n_dosen + 1),
+        "nama_dosen": [f"Dosen {i}" for i in range(1, n_dosen + 1)]
+    })
+    n_mk = max(1, n_courses // 2)
+    mk_genap_df = pd.DataFrame({
+        "id_mk_genap": range(1, n_mk + 1),
+        "nama_mk_genap": [f"MK {i}" for i in range(1, n_mk + 1)],
+        "smt": [rng.choice([2, 4, 6, 8]) for _ in range(n_mk)],
+        "sks": [rng.choice([1, 2, 2, 3, 3]) for _ in range(n_mk)],
+        "sifat": "Wajib",
+        "metode": "Luring",
+        "kategori": "Teori"
+    })
+    # Pasangan (dosen, mk) unik seperti primary key tbl_data_dosen
+    pairs = set()
+    while len(pairs) < min(n_courses, n_dosen * n_mk):
+        pairs.add((rng.randint(1, n_dosen), rng.randint(1, n_mk)))
+    data_dosen_df = pd.DataFrame(
+        [(id_dosen, id_mk, rng.choice("ABCD")) for id_dosen, id_mk in sorted(pairs)],
+        columns=["id_dosen", "id_mk_genap", "kelas"]
+    )
+    hari_df = pd.DataFrame({
+        "id_hari": range(1, n_days + 1),
+        "nama_hari": [DAY_NAMES[i % len(DAY_NAMES)] for i in range(n_days)]
+    })
+    ruang_df = pd.DataFrame({
+        "id_ruang": range(1, n_rooms + 1),
+        "nama_ruang": [f"R.{i}" for i in range(1, n_rooms + 1)]
+    })
+    # Jam dimulai tiap 50 menit sejak 07:00, masing-masing sepanjang jam_minutes
+    starts = [7 * 60 + 50 * i for i in range(n_jam)]
+    jam_df = pd.DataFrame({
+        "id_jam": range(1, n_jam + 1),
+        "jam_awal": [f"{m // 60}:{m % 60:02d}:00" for m in starts],
+        "jam_akhir": [f"{(m + jam_minutes) // 60}:{(m + jam_minutes) % 60:02d}:00" for m in starts]
+    })
+    data = ProblemData.from_frames(dosen_df, mk_genap_df, data_dosen_df, hari_df, ruang_df, jam_df)
+
+    lecturer_preferences = {}
+    for nama in dosen_df["nama_dosen"]:
+        if rng.random() >= preference_density:
+            continue
+        start = rng.randrange(n_jam)
+        end = rng.randrange(start, n_jam)
+        lecturer_preferences[nama] = {
+            "restricted_days": {rng.randint(1, n_days)},
+            "time_range": (starts[start], starts[end] + 50)
+        }
+    prodi_preferences = {"restricted_days": set(), "restricted_time_ranges": []}
+    for id_hari in range(1, n_days + 1):
+        if rng.random() < preference_density:
+            prodi_preferences["restricted_days"].add(id_hari)
+    if prodi_preferences["restricted_days"]:
+        start = rng.randrange(n_jam)
+        prodi_preferences["restricted_time_ranges"].append((starts[start], starts[start] + 50))
+    return ProblemSnapshot.from_data(data, lecturer_preferences, prodi_preferences)
+
+def measure(func, repeat):
+    # Waktu diukur tanpa tracemalloc; memori puncak diukur pada satu panggilan terpisah
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    wall = time.perf_counter() - started
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {
+        "calls": repeat,
+        "wall_seconds": round(wall, 6),
+        "per_sec": round(repeat / wall, 3) if wall > 0 else None,
+        "peak_memory_bytes": peak
+    }
+
+def run_gwo(problem, population_size, max_iterations, workers, islands, polish_seconds, seed):
+    gwo = GreyWolfOptimizer(population_size=population_size, max_iterations=max_iterations,
+                            problem=problem, workers=workers, islands=islands,
+                            polish_seconds=polish_seconds, seed=seed)
+    progress = {}
+    _, best_fitness = asyncio.run(gwo.optimize(
+        partial(create_random_schedule, problem),
+        lambda solution, temp_ids=None: collect_conflicts(solution, problem, temp_ids),
+        progress_callback=progress.update
+    ))
+    return best_fitness, progress.get("iteration", 0), gwo.timer.evaluations
+
+def benchmark_instance(name, params, args):
+    problem = generate_instance(**params, preference_density=args.preference_density, seed=args.seed)
+    rng = random.Random(args.seed)
+    schedules = [create_random_schedule(problem, rng) for _ in range(args.repeat)]
+    schedule_cycle = iter(schedules * 2)
+
+    _, create_stats = measure(lambda: create_random_schedule(problem, rng), args.repeat)
+    _, conflict_stats = measure(lambda: collect_conflicts(next(schedule_cycle), problem), args.repeat)
+    schedule_cycle = iter(schedules * 2)
+    _, fitness_stats = measure(lambda: calculate_fitness(next(schedule_cycle), problem), args.repeat)
+    schedule_cycle = iter(schedules * 2)
+    _, tracker_stats = measure(lambda: FitnessTracker(problem, next(schedule_cycle)).penalty, args.repeat)
+
+    gwo_args = (problem, args.population, args.iterations, args.workers, args.islands, args.polish, args.seed)
+    started = time.perf_counter()
+    best_fitness, iterations, evaluations = run_gwo(*gwo_args)
+    wall = time.perf_counter() - started
+    # tracemalloc hanya melihat proses utama; dengan process pool memori worker tidak ikut
+    tracemalloc.start()
+    run_gwo(*gwo_args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    uses_pool = args.workers > 1 or args.islands > 1
+
+    return {
+        "instance": dict(name=name, **params, preference_density=args.preference_density,
+                         seed=args.seed, n_slots=problem.n_slots,
+                         total_sks=int(problem.merged_df["sks"].sum())),
+        "create_random_schedule": create_stats,
+        "collect_conflicts": conflict_stats,
+        "calculate_fitness": fitness_stats,
+        "fitness_tracker_load": tracker_stats,
+        "gwo": {
+            "population_size": args.population,
+            "max_iterations": args.iterations,
+            "iterations": iterations,
+            "workers": args.workers,
+            "islands": args.islands,
+            "polish_seconds": args.polish,
+            "wall_seconds": round(wall, 6),
+            "evaluations": evaluations,
+            "evaluations_per_sec": round(evaluations / wall, 3) if wall > 0 else None,
+            "peak_memory_bytes": peak,
+            "peak_memory_scope": "parent_process" if uses_pool else "process",
+            "best_fitness": best_fitness
+        }
+    }
+
+def reference_conflicts(schedule, problem):
+    # Port pemeriksaan berpasangan versi awal: per grup diurutkan menurut jam
+    # mulai lalu semua pasangan (i, j) dibandingkan. Lambat, hanya untuk --verify.
+    slots = []
+    for idx in np.flatnonzero(schedule != EMPTY).tolist():
+        course = problem.courses[int(schedule[idx])]
+        slots.append(dict(course, id_slot=idx + 1, hari=int(problem.slot_hari[idx]),
+                          ruang=int(problem.slot_ruang[idx]), start=int(problem.slot_start[idx]),
+                          end=int(problem.slot_end[idx]), id_hari=problem.hari_ids[problem.slot_hari[idx]]))
+    conflict_temp_ids = set()
+
+    def pairs(key, differ=None):
+        groups = {}
+        for slot in slots:
+            groups.setdefault(key(slot), []).append(slot)
+        found = set()
+        for group in groups.values():
+            group.sort(key=lambda s: s['start'])
+            for i in range(len(group)):
+                for j in range(i + 1, len(group)):
+                    if group[j]['start'] < group[i]['end'] and (
+                            differ is None or group[i][differ] != group[j][differ]):
+                        conflict_temp_ids.update((group[i]['temp_id'], group[j]['temp_id']))
+                        found.add(tuple(sorted((group[i]['id_slot'], group[j]['id_slot']))))
+        return found
+
+    rooms = {}
+    for slot in slots:
+        rooms.setdefault(slot['temp_id'], set()).add(slot['ruang'])
+    room_consistency = {tid for tid, ruang in rooms.items() if len(ruang) > 1}
+    conflict_temp_ids.update(room_consistency)
+
+    preference = set()
+    prodi = problem.prodi_preferences
+    for slot in slots:
+        prefs = problem.lecturer_preferences.get(str(slot['dosen']))
+        if prefs is not None:
+            if slot['id_hari'] in prefs['restricted_days']:
+                preference.add(slot['temp_id'])
+            elif prefs['time_range'] and not prefs['time_range'][0] <= slot['start'] < prefs['time_range'][1]:
+                preference.add(slot['temp_id'])
+        if slot['id_hari'] in prodi['restricted_days'] and any(
+                start <= slot['start'] < end for start, end in prodi['restricted_time_ranges']):
+            preference.add(slot['temp_id'])
+
+    return {
+        'teacher_conflicts': pairs(lambda s: (s['dosen'], s['hari']), differ='mata_kuliah'),
+        'room_conflicts': pairs(lambda s: (s['ruang'], s['hari']), differ='kelas'),
+        'class_conflicts': pairs(lambda s: (s['kelas'], s['hari'], s['semester'])),
+        'room_consistency_conflicts': room_consistency,
+        'preference_conflict_temp_ids': preference,
+        'conflict_temp_ids': conflict_temp_ids
+    }
+
+def tracker_state(tracker):
+    # Isi tracker yang harus kembali persis setelah rollback jurnal
+    state = {name: getattr(tracker, name).tolist() for name in FitnessTracker.ARRAYS}
+    state.update(tracker.breakdown(), fingerprint=tracker.fingerprint)
+    state['slot_index'] = [sorted(tracker.slot_index.of(tid)) for tid in range(len(tracker.slot_index.count))]
+    return state
+
+def verify_schedule(problem, gwo, schedule, rng, check):
+    reference = reference_conflicts(schedule, problem)
+    conflicts = collect_conflicts(schedule, problem)
+    for name in ('teacher_conflicts', 'room_conflicts', 'class_conflicts'):
+        check(name, set(map(tuple, map(sorted, conflicts[name]))) == reference[name])
+    check('room_consistency_conflicts',
+          {c['temp_id'] for c in conflicts['room_consistency_conflicts']} == reference['room_consistency_conflicts'])
+    for name in ('preference_conflict_temp_ids', 'conflict_temp_ids'):
+        check(name, conflicts[name] == reference[name])
+    penalty = calculate_fitness(schedule, problem)
+    check('calculate_fitness', penalty == (
+        len(reference['teacher_conflicts']) + len(reference['room_conflicts']) +
+        len(reference['class_conflicts']) + len(reference['room_consistency_conflicts']) +
+        0.5 * len(reference['preference_conflict_temp_ids'])))
+
+    tracker = FitnessTracker(problem, schedule)
+    check('tracker_penalty', tracker.penalty == penalty)
+    check('tracker_conflict_temp_ids', tracker.conflict_temp_ids(schedule) == conflicts['conflict_temp_ids'])
+    check('collect_conflicts_temp_ids',
+          collect_conflicts(schedule, problem, conflicts['conflict_temp_ids']) == conflicts)
+    for sks in range(1, 4):
+        for max_gap in (0, 5):
+            check('free_block_starts', free_block_starts(problem, schedule, sks, max_gap) == [
+                pos for pos in range(len(schedule) - sks + 1) if gwo.block_fits(schedule, pos, sks, max_gap)
+            ])
+
+    # Langkah acak lewat jurnal: tracker inkremental harus sama dengan hitung ulang,
+    # lalu rollback harus mengembalikan jadwal dan tracker persis seperti semula
+    original = schedule.copy()
+    state = tracker_state(tracker)
+    journal = ScheduleJournal(schedule.copy(), tracker.copy())
+    placed = [tid for tid in problem.courses if journal.tracker.slot_index.count[tid]]
+    for tid in rng.sample(placed, min(5, len(placed))):
+        journal.remove(tid, journal.tracker.slot_index.of(tid))
+        busy = journal.tracker.busy_slots(tid)
+        check('busy_slots', busy.tolist() == [
+            sum(journal.tracker._pairs_with(tid, s)[::2]) > 0 for s in range(problem.n_slots)
+        ])
+        gwo.schedule_course(journal, problem.courses[tid], force=True, relax=True)
+        check('tracker_incremental', journal.tracker.penalty == calculate_fitness(journal.schedule, problem))
+        check('tracker_fingerprint', journal.tracker.fingerprint == schedule_fingerprint(problem, journal.schedule))
+    journal.rollback()
+    check('rollback_schedule', (journal.schedule == original).all())
+    check('rollback_tracker', tracker_state(journal.tracker) == state)
+
+def verify_instance(name, params, args):
+    # Kesetaraan implementasi cepat dengan pemeriksaan berpasangan versi awal, pada
+    # jadwal acak (sedikit bentrok) dan jadwal padat acak (banyak bentrok)
+    results = []
+    for jam_minutes in (50, 90):
+        problem = generate_instance(**params, preference_density=args.preference_density, seed=args.seed,
+                                    jam_minutes=jam_minutes)
+        gwo = GreyWolfOptimizer(problem=problem, seed=args.seed)
+        rng = random.Random(args.seed)
+        np_rng = np.random.default_rng(args.seed)
+        tids = np.array(sorted(problem.courses))
+        checks = 0
+        failures = {}
+
+        def check(label, ok):
+            nonlocal checks
+            checks += 1
+            if not ok:
+                failures[label] = failures.get(label, 0) + 1
+
+        for k in range(args.verify_schedules):
+            if k % 2 == 0:
+                schedule = create_random_schedule(problem, rng)
+            else:
+                schedule = np.full(problem.n_slots, EMPTY, dtype=np.int32)
+                fill = np_rng.random(problem.n_slots) < rng.uniform(0.2, 0.9)
+                schedule[fill] = np_rng.choice(tids, fill.sum())
+            verify_schedule(problem, gwo, schedule, rng, check)
+        results.append({
+            "instance": dict(name=name, **params, jam_minutes=jam_minutes, seed=args.seed),
+            "schedules": args.verify_schedules,
+            "checks": checks,
+            "failures": failures
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark optimasi jadwal dengan instance sintetis")
+    parser.add_argument("--sizes", default="small,medium", help=f"Daftar ukuran: {', '.join(SIZES)}")
+    parser.add_argument("--preference-density", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=50, help="Jumlah panggilan per micro-benchmark")
+    parser.add_argument("--population", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--islands", type=int, default=1)
+    parser.add_argument("--polish", type=float, default=0.0, help="Detik pencarian lokal setelah GWO")
+    parser.add_argument("--output", help="File JSON keluaran (default: stdout)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Periksa kesetaraan fitness/konflik/jurnal dengan pemeriksaan berpasangan, tanpa benchmark")
+    parser.add_argument("--verify-schedules", type=int, default=20, help="Jumlah jadwal acak per instance untuk --verify")
+    args = parser.parse_args()
+
+    # Keluaran print optimizer dialihkan ke stderr agar stdout tetap JSON murni
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.verify:
+            results = [result for name in args.sizes.split(",") for result in verify_instance(name, SIZES[name], args)]
+        else:
+            results = [benchmark_instance(name, SIZES[name], args) for name in args.sizes.split(",")]
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+    if args.verify and any(result["failures"] for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from process import *
 
 if __name__ == "__main__":
+    db = SessionLocal()
     population_sizes = [30]
     max_iterations_list = [30]
     num_experiments = 30
@@ -10,13 +11,13 @@ if __name__ == "__main__":
     for pop_size in population_sizes:
         for max_iter in max_iterations_list:
             for experiment in range(num_experiments):
-                best_schedule, best_fitness = run_gwo_optimization(
+                best_schedule, best_fitness = asyncio.run(run_gwo_optimization(
                     create_random_schedule,
-                    calculate_fitness,
                     collect_conflicts,
-                    population_size=pop_size,
-                    max_iterations=max_iter
-                )
+                    pop_size,
+                    max_iter,
+                    db
+                ))
                 print(f"Experiment {experiment+1}/{num_experiments} (Population: {pop_size}, Iterations: {max_iter}) - Best Fitness: {best_fitness}")
                 experiment_data.append((pop_size, max_iter, best_fitness))
     
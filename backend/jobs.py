@@ -0,0 +1,75 @@
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+class Job:
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = "pending"
+        self.progress = {}
+        self.result = None
+        self.schedule = None
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+class JobRunner:
+    # Menjalankan optimasi di thread terpisah agar event loop API tetap responsif
+    def __init__(self, max_workers=2, max_finished_jobs=20):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, func, params):
+        job = Job(params)
+        with self.lock:
+            self.jobs[job.id] = job
+            self.prune()
+        self.executor.submit(self.run, job, func)
+        return job
+
+    def run(self, job, func):
+        job.status = "running"
+        job.started_at = datetime.now().isoformat()
+        try:
+            func(job)
+            job.status = "done"
+        except Exception as e:
+            print(f"Error in job {job.id}: {str(e)}")
+            print(traceback.format_exc())
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now().isoformat()
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def prune(self):
+        # Simpan hanya sejumlah job selesai terakhir beserta jadwalnya
+        finished = [job for job in self.jobs.values() if job.status in ("done", "failed")]
+        for job in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job.id]
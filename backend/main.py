@@ -1,14 +1,17 @@
 import asyncio
 import json
+import os
+import tempfile
 from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session, joinedload
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List
 
-from database import get_db
+from database import get_db, SessionLocal
 from models import Dosen, DataDosen, MkGenap, Hari, Jam, PreferensiDosen, PreferensiProdi, Ruang
 from schemas import DosenSchema, MkGenapSchema, DosenWithMkSchema, HariSchema, JamSchema, PreferensiSchema, ProdiScemas, RuangSchema, DataDosenCreate, DataDosenSchema, ScheduleRequest
-from process import run_gwo_optimization, create_random_schedule, calculate_fitness, collect_conflicts
+from process import run_gwo_optimization, create_random_schedule, collect_conflicts, invalidate_problem_data
+from jobs import JobRunner
 
 app = FastAPI()
 
@@ -21,6 +24,7 @@ app.add_middleware(
 )
 
 log_clients = []
+job_runner = JobRunner()
 
 async def broadcast_log(message: str):
     # Iterasi atas salinan daftar log_clients agar aman saat menghapus koneksi yang sudah mati
@@ -67,6 +71,7 @@ def create_dosen(dosen: DosenSchema, db: Session = Depends(get_db)):
         new_dosen = Dosen(**dosen.dict())
         db.add(new_dosen)
         db.commit()
+        invalidate_problem_data()
         db.refresh(new_dosen)
         return new_dosen
     except Exception as e:
@@ -82,6 +87,7 @@ def delete_dosen(id_dosen: int, db: Session = Depends(get_db)):
         
         db.delete(dosen)
         db.commit()
+        invalidate_problem_data()
         return {"message": "Dosen deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -96,6 +102,7 @@ def update_dosen(id_dosen: int, dosen: DosenSchema, db: Session = Depends(get_db
         
         db_dosen.nama_dosen = dosen.nama_dosen
         db.commit()
+        invalidate_problem_data()
         db.refresh(db_dosen)
         return db_dosen
     except Exception as e:
@@ -119,6 +126,7 @@ def create_mk_genap(mk_genap: MkGenapSchema, db: Session = Depends(get_db)):
         new_mk_genap = MkGenap(**mk_genap.dict())
         db.add(new_mk_genap)
         db.commit()
+        invalidate_problem_data()
         db.refresh(new_mk_genap)
         return new_mk_genap
     except Exception as e:
@@ -134,6 +142,7 @@ def delete_mk_genap(id_mk_genap: int, db: Session = Depends(get_db)):
         
         db.delete(mk_genap)
         db.commit()
+        invalidate_problem_data()
         return {"message": "Mata kuliah deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -152,6 +161,7 @@ def update_mk_genap(id_mk_genap: int, mk_genap: MkGenapSchema, db: Session = Dep
         db_mk_genap.sifat = mk_genap.sifat
         db_mk_genap.metode = mk_genap.metode
         db.commit()
+        invalidate_problem_data()
         db.refresh(db_mk_genap)
         return db_mk_genap
     except Exception as e:
@@ -216,6 +226,7 @@ def create_data_dosen(data: DataDosenCreate, db: Session = Depends(get_db)):
         new_data = DataDosen(**data.dict())
         db.add(new_data)
         db.commit()
+        invalidate_problem_data()
         db.refresh(new_data)
         return new_data
     except Exception as e:
@@ -234,6 +245,7 @@ def delete_data_dosen(id_dosen: int, id_mk_genap: int, db: Session = Depends(get
         
         db.delete(data)
         db.commit()
+        invalidate_problem_data()
         return {"message": "Data deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -261,6 +273,7 @@ def create_hari(hari: HariSchema, db: Session = Depends(get_db)):
         new_hari = Hari(**hari.dict())
         db.add(new_hari)
         db.commit()
+        invalidate_problem_data()
         db.refresh(new_hari)
         return new_hari
     except Exception as e:
@@ -276,6 +289,7 @@ def delete_hari(id_hari: int, db: Session = Depends(get_db)):
         
         db.delete(hari)
         db.commit()
+        invalidate_problem_data()
         return {"message": "Hari deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -290,6 +304,7 @@ def update_hari(id_hari: int, hari: HariSchema, db: Session = Depends(get_db)):
         
         db_hari.nama_hari = hari.nama_hari
         db.commit()
+        invalidate_problem_data()
         db.refresh(db_hari)
         return db_hari
     except Exception as e:
@@ -313,6 +328,7 @@ def create_jam(jam: JamSchema, db: Session = Depends(get_db)):
         new_jam = Jam(**jam.dict())
         db.add(new_jam)
         db.commit()
+        invalidate_problem_data()
         db.refresh(new_jam)
         return new_jam
     except Exception as e:
@@ -327,6 +343,7 @@ def delete_jam(id_jam: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Jam not found")
         db.delete(jam)
         db.commit()
+        invalidate_problem_data()
         return {"message": "Jam deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -341,6 +358,7 @@ def update_jam(id_jam: int, jam: JamSchema, db: Session = Depends(get_db)):
         db_jam.jam_awal = jam.jam_awal
         db_jam.jam_akhir = jam.jam_akhir
         db.commit()
+        invalidate_problem_data()
         db.refresh(db_jam)
         return db_jam
     except Exception as e:
@@ -364,6 +382,7 @@ def create_ruang(ruang: RuangSchema, db: Session = Depends(get_db)):
         new_ruang = Ruang(**ruang.dict())
         db.add(new_ruang)
         db.commit()
+        invalidate_problem_data()
         db.refresh(new_ruang)
         return new_ruang
     except Exception as e:
@@ -379,6 +398,7 @@ def delete_ruang(id_ruang: int, db: Session = Depends(get_db)):
         
         db.delete(ruang)
         db.commit()
+        invalidate_problem_data()
         return {"message": "Ruang deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -393,35 +413,108 @@ def update_ruang(id_ruang: int, ruang: RuangSchema, db: Session = Depends(get_db
         
         db_ruang.nama_ruang = ruang.nama_ruang
         db.commit()
+        invalidate_problem_data()
         db.refresh(db_ruang)
         return db_ruang
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/generate-schedule/")
-async def generate_schedule(request: ScheduleRequest, db: Session = Depends(get_db)):
+def save_schedule(schedule, path='./output.json'):
+    # Tulis ke file sementara di direktori yang sama lalu ganti secara atomik,
+    # agar pembaca (/schedule, warm start job lain) tidak melihat file setengah jadi
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(schedule, f, indent=4)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+def run_schedule_job(job, request: ScheduleRequest, loop):
+    # Dijalankan di thread job runner dengan session dan event loop sendiri
+    db = SessionLocal()
     try:
         def log_callback(message: str):
-            asyncio.create_task(broadcast_log(message))
-        best_schedule, best_fitness = await run_gwo_optimization(
+            if not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(broadcast_log(message), loop)
+        def progress_callback(progress: dict):
+            job.progress = progress
+        # Telemetri per iterasi dikirim sebagai JSON ke /ws/logs dan disimpan di hasil job
+        metrics = {"iterations": [], "summary": None}
+        def metrics_callback(event: dict):
+            if event["event"] == "summary":
+                metrics["summary"] = event
+            else:
+                metrics["iterations"].append(event)
+            log_callback(json.dumps(event))
+        previous_schedule = None
+        if request.warm_start and os.path.exists('./output.json'):
+            with open('./output.json', 'r') as f:
+                previous_schedule = json.load(f)
+        best_schedule, best_fitness = asyncio.run(run_gwo_optimization(
             create_random_schedule,
-            lambda sol: calculate_fitness(sol, db),
-            lambda sol: collect_conflicts(sol, db),
+            collect_conflicts,
             request.population_size,
             request.max_iterations,
-            log_callback=log_callback
-        )
-        with open('./output.json', 'w') as f:
-            json.dump(best_schedule, f, indent=4)
-        return {
-            "fitness": best_fitness
+            db,
+            log_callback=log_callback,
+            workers=request.workers,
+            progress_callback=progress_callback,
+            polish_seconds=request.polish_seconds,
+            time_limit_seconds=request.time_limit_seconds,
+            target_fitness=request.target_fitness,
+            stagnation_iterations=request.stagnation_iterations,
+            islands=request.islands,
+            migration_interval=request.migration_interval,
+            previous_schedule=previous_schedule,
+            warm_start_ratio=request.warm_start_ratio,
+            seed=request.seed,
+            metrics_callback=metrics_callback,
+            fitness_cache_size=request.fitness_cache_size
+        ))
+        save_schedule(best_schedule)
+        job.schedule = best_schedule
+        job.result = {
+            "fitness": best_fitness,
+            "metrics": metrics
         }
-    except Exception as e:
-        import traceback
-        print(f"Error in generate_schedule: {str(e)}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"Failed to generate schedule: {str(e)}")
+    finally:
+        db.close()
+
+@app.post("/generate-schedule/")
+async def generate_schedule(request: ScheduleRequest):
+    loop = asyncio.get_running_loop()
+    job = job_runner.submit(
+        lambda job: run_schedule_job(job, request, loop),
+        request.dict()
+    )
+    return {
+        "job_id": job.id,
+        "status": job.status
+    }
+
+@app.get("/jobs")
+def get_jobs():
+    return [job.to_dict() for job in job_runner.list()]
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/schedule")
+def get_job_schedule(job_id: str):
+    job = job_runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.schedule is None:
+        raise HTTPException(status_code=400, detail=f"Job belum selesai (status: {job.status})")
+    return job.schedule
 
 @app.get("/schedule")
 def get_schedule():
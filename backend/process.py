@@ -1,16 +1,20 @@
 import asyncio
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from database import get_db
+from database import SessionLocal
 from models import Dosen, DataDosen, MkGenap, Hari, Jam, PreferensiProdi, Ruang, PreferensiDosen
 
-import copy
 import numpy as np
 import pandas as pd
-from datetime import datetime
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 import json
 import random
+import sys
+import threading
+import time
 
 def query_to_dataframe(query_result):
     dict_list = [item.__dict__ for item in query_result]
@@ -19,124 +23,97 @@ def query_to_dataframe(query_result):
     return pd.DataFrame(dict_list)
 
 def time_to_minutes(t):
-    try:
-        dt = datetime.strptime(t, "%H:%M:%S")
-    except ValueError:
-        dt = datetime.strptime(t, "%H:%M")
-    return dt.hour * 60 + dt.minute
-
-db: Session = next(get_db())
-
-dosen_df = query_to_dataframe(db.query(Dosen).all())
-mk_genap_df = query_to_dataframe(db.query(MkGenap).all())
-data_dosen_df = query_to_dataframe(db.query(DataDosen).all())
-hari_df = query_to_dataframe(db.query(Hari).all())
-ruang_df = query_to_dataframe(db.query(Ruang).all())
-jam_df = query_to_dataframe(db.query(Jam).all())
-
-jam_df = jam_df.sort_values('id_jam')
-day_map = dict(zip(hari_df['id_hari'], hari_df['nama_hari']))
-jam_mulai_map = dict(zip(jam_df['id_jam'], jam_df['jam_awal']))
-jam_selesai_map = dict(zip(jam_df['id_jam'], jam_df['jam_akhir']))
-
-merged_df = pd.merge(
-    pd.merge(data_dosen_df, dosen_df, on='id_dosen'),
-    mk_genap_df, on='id_mk_genap'
-)
-merged_df['temp_id'] = range(1, len(merged_df) + 1)
+    # Format "H:MM:SS" atau "H:MM"; hanya dipanggil saat membangun tabel menit
+    parts = str(t).split(':')
+    return int(parts[0]) * 60 + int(parts[1])
 
-# ------------------------
-# GENERATOR SLOT & JADWAL
-# ------------------------
+def minute_table(id_jam, times):
+    # Tabel menit diindeks langsung dengan id_jam, -1 untuk id yang tidak ada
+    ids = [int(i) for i in id_jam]
+    table = np.full(max(ids, default=0) + 1, -1, dtype=np.int64)
+    for i, t in zip(ids, times):
+        table[i] = time_to_minutes(t)
+    return table
 
-def slot_generator():
-    slots = []
-    id_counter = 1
-    for hari in hari_df['nama_hari']:
-        for ruang in ruang_df['nama_ruang']:
-            for jam in jam_df.itertuples():
-                slots.append({
-                    "id_slot": id_counter,
-                    "id_mk": None,
-                    "mata_kuliah": None,
-                    "id_dosen": None,
-                    "dosen": None,
-                    "ruang": ruang,
-                    "hari": hari,
-                    "jam_mulai": jam.jam_awal,
-                    "jam_selesai": jam.jam_akhir,
-                    "semester": None,
-                    "kelas": None,
-                    "sks": None,
-                    "metode": None,
-                    "status": None,
-                    "temp_id": None
-                })
-                id_counter += 1
-    return slots
+def lookup_minutes(table, id_jam):
+    if id_jam is None or not 0 <= id_jam < len(table) or table[id_jam] < 0:
+        return None
+    return int(table[id_jam])
 
-def create_random_schedule():
-    schedule = slot_generator()
-    merged_shuffled = merged_df.sample(frac=1).iterrows()
-
-    room_allocations = defaultdict(list)
-    teacher_allocations = defaultdict(list)
-    class_allocations = defaultdict(list)
-
-    for _, row in merged_shuffled:
-        id_mk = row['id_mk_genap']
-        mata_kuliah = row['nama_mk_genap']
-        id_dosen = row['id_dosen']
-        dosen = row['nama_dosen']
-        kelas = row['kelas']
-        sks = int(row['sks'])
-        semester = row['smt']
-        metode = row['metode']
-        temp_id = row['temp_id']
-
-        possible_positions = list(range(len(schedule) - sks + 1))
-        random.shuffle(possible_positions)
-
-        candidate_blocks = []
-        for i in possible_positions:
-            block = schedule[i:i+sks]
-            if not all(slot['mata_kuliah'] is None for slot in block):
-                continue
-            if not all(slot['hari'] == block[0]['hari'] for slot in block):
-                continue
-            if not all(slot['ruang'] == block[0]['ruang'] for slot in block):
-                continue
-            hari_block = block[0]['hari']
-            time_block = (time_to_minutes(block[0]['jam_mulai']), time_to_minutes(block[-1]['jam_selesai']))
-            kelas_already = len(class_allocations[(kelas, hari_block)]) > 0
-            candidate_blocks.append((block, time_block, kelas_already))
-        
-        if candidate_blocks:
-            selected_block = candidate_blocks[0][0]
-            for slot in selected_block:
-                slot.update({
-                    "id_mk": id_mk,
-                    "mata_kuliah": mata_kuliah,
-                    "id_dosen": id_dosen,
-                    "dosen": dosen,
-                    "kelas": kelas,
-                    "sks": sks,
-                    "semester": semester,
-                    "metode": metode,
-                    "temp_id": temp_id
-                })
-            hari_block = selected_block[0]['hari']
-            time_block = (time_to_minutes(selected_block[0]['jam_mulai']),
-                          time_to_minutes(selected_block[-1]['jam_selesai']))
-            room_allocations[(selected_block[0]['ruang'], hari_block)].append(time_block)
-            teacher_allocations[(dosen, hari_block)].append(time_block)
-            class_allocations[(kelas, hari_block)].append(time_block)
-        else:
-            print(f"Gagal menempatkan: {kelas} - {mata_kuliah} - {dosen}")
-    
-    return schedule
+class ProblemData:
+    # Tabel master yang dibutuhkan optimasi, dibaca sekali per versi cache
+    def __init__(self, db: Session, version=0):
+        self.version = version
+        self.load_frames(
+            query_to_dataframe(db.query(Dosen).all()),
+            query_to_dataframe(db.query(MkGenap).all()),
+            query_to_dataframe(db.query(DataDosen).all()),
+            query_to_dataframe(db.query(Hari).all()),
+            query_to_dataframe(db.query(Ruang).all()),
+            query_to_dataframe(db.query(Jam).all())
+        )
+
+    @classmethod
+    def from_frames(cls, dosen_df, mk_genap_df, data_dosen_df, hari_df, ruang_df, jam_df, version=0):
+        # Tanpa database, mis. untuk instance sintetis di benchmark.py
+        data = cls.__new__(cls)
+        data.version = version
+        data.load_frames(dosen_df, mk_genap_df, data_dosen_df, hari_df, ruang_df, jam_df)
+        return data
+
+    def load_frames(self, dosen_df, mk_genap_df, data_dosen_df, hari_df, ruang_df, jam_df):
+        self.hari_df = hari_df
+        self.ruang_df = ruang_df
+        self.jam_df = jam_df.sort_values('id_jam')
+
+        self.day_map = dict(zip(self.hari_df['id_hari'], self.hari_df['nama_hari']))
+        self.jam_mulai_minutes = minute_table(self.jam_df['id_jam'], self.jam_df['jam_awal'])
+        self.jam_selesai_minutes = minute_table(self.jam_df['id_jam'], self.jam_df['jam_akhir'])
+
+        self.merged_df = pd.merge(
+            pd.merge(data_dosen_df, dosen_df, on='id_dosen'),
+            mk_genap_df, on='id_mk_genap'
+        )
+        self.merged_df['temp_id'] = range(1, len(self.merged_df) + 1)
+
+class ProblemDataCache:
+    # Dimuat saat optimasi pertama (bukan saat import), lalu dimuat ulang
+    # setelah endpoint CRUD memanggil invalidate()
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = 0
+        self.data = None
+
+    def invalidate(self):
+        with self.lock:
+            self.version += 1
+
+    def get(self, db: Session):
+        with self.lock:
+            if self.data is None or self.data.version != self.version:
+                self.data = ProblemData(db, self.version)
+            return self.data
+
+problem_data = ProblemDataCache()
 
-def get_lecturer_preferences(db: Session):
+def invalidate_problem_data():
+    problem_data.invalidate()
+
+def parse_days(hari, day_map):
+    # Kolom hari berupa JSON: bisa satu id, list id, atau nama hari
+    if not hari:
+        return set()
+    values = hari if isinstance(hari, list) else [hari]
+    day_ids = {str(nama).lower(): id_hari for id_hari, nama in day_map.items()}
+    days = set()
+    for value in values:
+        if value in day_map:
+            days.add(int(value))
+        elif str(value).lower() in day_ids:
+            days.add(int(day_ids[str(value).lower()]))
+    return days
+
+def get_lecturer_preferences(db: Session, data: ProblemData):
     query = (
         select(
             Dosen.nama_dosen,
@@ -149,23 +126,20 @@ def get_lecturer_preferences(db: Session):
     results = db.execute(query).fetchall()
     lecturer_preferences = {}
     for nama_dosen, hari, jam_mulai_id, jam_selesai_id in results:
-        if hari:
-            if isinstance(hari, list):
-                restricted_days = [day_map.get(day_id, day_id) for day_id in hari]
-            else:
-                restricted_days = [day_map.get(hari, hari)]
-        else:
-            restricted_days = []
-        if jam_mulai_id is not None and jam_selesai_id is not None:
-            time_range = [jam_mulai_map.get(jam_mulai_id), jam_selesai_map.get(jam_selesai_id)]
+        restricted_days = parse_days(hari, data.day_map)
+        start = lookup_minutes(data.jam_mulai_minutes, jam_mulai_id)
+        end = lookup_minutes(data.jam_selesai_minutes, jam_selesai_id)
+        if start is not None and end is not None:
+            time_range = (start, end)
         else:
-            time_range = []
+            time_range = None
         lecturer_preferences[nama_dosen] = {
             "restricted_days": restricted_days,
             "time_range": time_range
         }
     return lecturer_preferences
-def get_prodi_preferences(db: Session):
+
+def get_prodi_preferences(db: Session, data: ProblemData):
     query = (
         select(
             PreferensiProdi.hari,
@@ -175,147 +149,466 @@ def get_prodi_preferences(db: Session):
     )
     results = db.execute(query).fetchall()
     prodi_preferences = {
-        "restricted_days": [],
+        "restricted_days": set(),
         "restricted_time_ranges": []
     }
     for hari, jam_mulai_id, jam_selesai_id in results:
         # Proses hari terlarang
-        if hari:
-            if isinstance(hari, list):
-                restricted_days = [day_map.get(day, day) for day in hari]
-            else:
-                restricted_days = [day_map.get(hari, hari)]
-            prodi_preferences["restricted_days"].extend(restricted_days)
+        prodi_preferences["restricted_days"].update(parse_days(hari, data.day_map))
         
         # Proses rentang waktu terlarang
-        if jam_mulai_id is not None and jam_selesai_id is not None:
-            start = jam_mulai_map.get(jam_mulai_id)
-            end = jam_selesai_map.get(jam_selesai_id)
-            if start and end:
-                prodi_preferences["restricted_time_ranges"].append((start, end))
+        start = lookup_minutes(data.jam_mulai_minutes, jam_mulai_id)
+        end = lookup_minutes(data.jam_selesai_minutes, jam_selesai_id)
+        if start is not None and end is not None:
+            prodi_preferences["restricted_time_ranges"].append((start, end))
                 
     return prodi_preferences
 
-def collect_conflicts(schedule, db: Session):
+def encode_column(values):
+    # temp_id berurutan 1..n, indeks 0 dibiarkan kosong
+    if isinstance(values, pd.DataFrame):
+        codes = values.groupby(list(values.columns), sort=False, dropna=False).ngroup().to_numpy()
+    else:
+        codes = pd.factorize(values)[0]
+    return np.concatenate(([-1], codes)).astype(np.int64)
+
+class ProblemSnapshot:
+    # Data statis satu kali optimasi: preferensi dibaca sekali dari database
+    # sehingga loop GWO tidak lagi melakukan query.
+    def __init__(self, db: Session):
+        data = problem_data.get(db)
+        self.build(data, get_lecturer_preferences(db, data), get_prodi_preferences(db, data))
+
+    @classmethod
+    def from_data(cls, data: ProblemData, lecturer_preferences, prodi_preferences):
+        # Snapshot dari ProblemData dan preferensi yang sudah jadi (tanpa query)
+        snapshot = cls.__new__(cls)
+        snapshot.build(data, lecturer_preferences, prodi_preferences)
+        return snapshot
+
+    def build(self, data: ProblemData, lecturer_preferences, prodi_preferences):
+        merged_df = data.merged_df
+        self.data_version = data.version
+        self.merged_df = merged_df
+        self.lecturer_preferences = lecturer_preferences
+        self.prodi_preferences = prodi_preferences
+
+        # Lookup slot statis; jadwal cukup menyimpan temp_id per indeks slot
+        self.hari_names = list(data.hari_df['nama_hari'])
+        self.hari_ids = [int(id_hari) for id_hari in data.hari_df['id_hari']]
+        self.ruang_names = list(data.ruang_df['nama_ruang'])
+        self.jam_mulai = list(data.jam_df['jam_awal'])
+        self.jam_selesai = list(data.jam_df['jam_akhir'])
+        self.slot_hari, self.slot_ruang, self.slot_jam = slot_generator(
+            len(self.hari_names), len(self.ruang_names), len(self.jam_mulai)
+        )
+        self.slot_group = self.slot_hari * len(self.ruang_names) + self.slot_ruang
+        self.n_slots = len(self.slot_hari)
+        jam_ids = data.jam_df['id_jam'].to_numpy(dtype=np.int64)
+        self.slot_start = data.jam_mulai_minutes[jam_ids][self.slot_jam]
+        self.slot_end = data.jam_selesai_minutes[jam_ids][self.slot_jam]
+        # Jeda (menit) antara slot dan slot sebelumnya, untuk cek blok berurutan
+        self.slot_gap = np.abs(self.slot_start - np.roll(self.slot_end, 1))
+        # Matriks jam yang waktunya beririsan (diagonal = jam itu sendiri)
+        jam_start = data.jam_mulai_minutes[jam_ids]
+        jam_end = data.jam_selesai_minutes[jam_ids]
+        self.jam_overlap = ((jam_start[:, None] < jam_end[None, :]) &
+                            (jam_start[None, :] < jam_end[:, None])).astype(np.int64)
+        self.jam_overlaps = [np.flatnonzero(row).tolist() for row in self.jam_overlap]
+        # Bitset okupansi (hari x jam): bit slot itu sendiri dan bit semua jam
+        # yang beririsan dengannya pada hari yang sama
+        n_jam = len(self.jam_mulai)
+        self.slot_bits = [1 << int(h * n_jam + j) for h, j in zip(self.slot_hari, self.slot_jam)]
+        self.slot_overlap_bits = [
+            sum(1 << int(h * n_jam + k) for k in self.jam_overlaps[j])
+            for h, j in zip(self.slot_hari, self.slot_jam)
+        ]
+
+        self.courses = {
+            int(row['temp_id']): {
+                "id_mk": row['id_mk_genap'],
+                "mata_kuliah": row['nama_mk_genap'],
+                "id_dosen": row['id_dosen'],
+                "dosen": row['nama_dosen'],
+                "kelas": row['kelas'],
+                "sks": int(row['sks']),
+                "semester": row['smt'],
+                "metode": row['metode'],
+                "temp_id": int(row['temp_id'])
+            }
+            for row in merged_df.to_dict('records')
+        }
+        # Daftar ringkas (temp_id, sks, mata_kuliah, dosen, kelas) untuk konstruksi jadwal
+        self.course_list = [
+            (course['temp_id'], course['sks'], course['mata_kuliah'], course['dosen'], course['kelas'])
+            for course in self.courses.values()
+        ]
+
+        # Atribut mata kuliah dalam bentuk kode integer, diindeks dengan temp_id
+        self.n_courses = len(merged_df) + 1
+        self.course_dosen = encode_column(merged_df['nama_dosen'])
+        self.course_mk = encode_column(merged_df['nama_mk_genap'])
+        self.course_kelas = encode_column(merged_df['kelas'])
+        self.course_dosen_mk = encode_column(merged_df[['nama_dosen', 'nama_mk_genap']])
+        self.course_class = encode_column(merged_df[['kelas', 'smt']])
+
+        # Pelanggaran preferensi per (dosen, slot) dan preferensi prodi per slot
+        slot_day_ids = np.array(self.hari_ids, dtype=np.int64)[self.slot_hari]
+        dosen_names = pd.factorize(merged_df['nama_dosen'])[1]
+        self.dosen_preference_violation = np.zeros((len(dosen_names), self.n_slots), dtype=bool)
+        for code, nama in enumerate(dosen_names):
+            prefs = self.lecturer_preferences.get(str(nama))
+            if prefs is None:
+                continue
+            violation = np.isin(slot_day_ids, list(prefs['restricted_days']))
+            if prefs['time_range']:
+                allowed_start, allowed_end = prefs['time_range']
+                violation |= (self.slot_start < allowed_start) | (self.slot_start >= allowed_end)
+            self.dosen_preference_violation[code] = violation
+        prodi_days = np.isin(slot_day_ids, list(self.prodi_preferences['restricted_days']))
+        self.prodi_preference_violation = np.zeros(self.n_slots, dtype=bool)
+        for restricted_start, restricted_end in self.prodi_preferences['restricted_time_ranges']:
+            self.prodi_preference_violation |= prodi_days & (
+                (self.slot_start >= restricted_start) & (self.slot_start < restricted_end)
+            )
+        # Kunci acak tetap per slot untuk sidik jari jadwal (hash Zobrist)
+        self.slot_keys = np.random.default_rng(0).integers(1, 2**63, size=self.n_slots, dtype=np.uint64)
+
+    def preference_violation(self, tids, slot_idx):
+        return (self.dosen_preference_violation[self.course_dosen[tids], slot_idx] |
+                self.prodi_preference_violation[slot_idx])
+
+# ------------------------
+# GENERATOR SLOT & JADWAL
+# ------------------------
+
+FINGERPRINT_MASK = 2**64 - 1
+
+def fingerprint_term(problem, tid, s):
+    # Kontribusi (slot, temp_id) ke sidik jari; XOR sehingga tambah = hapus
+    return (int(problem.slot_keys[s]) * (2 * int(tid) + 1)) & FINGERPRINT_MASK
+
+def schedule_fingerprint(problem, schedule):
+    slot_idx = np.flatnonzero(schedule != EMPTY)
+    terms = problem.slot_keys[slot_idx] * (2 * schedule[slot_idx].astype(np.uint64) + 1)
+    return int(np.bitwise_xor.reduce(terms, initial=0))
+
+EMPTY = -1
+# Jumlah undian blok per mata kuliah saat mencari blok tanpa bentrok dosen/kelas
+PLACEMENT_ATTEMPTS = 10
+
+def slot_generator(n_hari, n_ruang, n_jam):
+    # Urutan slot: hari -> ruang -> jam, id_slot = indeks + 1
+    slot_hari, slot_ruang, slot_jam = np.meshgrid(
+        np.arange(n_hari), np.arange(n_ruang), np.arange(n_jam), indexing='ij'
+    )
+    return slot_hari.ravel(), slot_ruang.ravel(), slot_jam.ravel()
+
+def empty_schedule(problem: ProblemSnapshot):
+    return np.full(problem.n_slots, EMPTY, dtype=np.int32)
+
+class FreeBlockIndex:
+    # Indeks run slot kosong yang berurutan per (hari, ruang). Run dikelompokkan
+    # menurut panjangnya sehingga blok acak sepanjang sks bisa diambil tanpa
+    # memindai seluruh jadwal.
+    def __init__(self, problem: ProblemSnapshot, schedule):
+        self.problem = problem
+        self.max_length = len(problem.jam_mulai)
+        self.by_length = [[] for _ in range(self.max_length + 1)]
+        self.position = {}
+        self.length = {}
+        self.run_of = np.full(problem.n_slots, EMPTY, dtype=np.int64)
+        start = None
+        for idx in range(problem.n_slots + 1):
+            free = idx < problem.n_slots and schedule[idx] == EMPTY
+            if start is not None and (not free or problem.slot_group[idx] != problem.slot_group[start]):
+                self.add_run(start, idx - start)
+                start = None
+            if free and start is None:
+                start = idx
+
+    def add_run(self, start, length):
+        bucket = self.by_length[length]
+        self.position[start] = len(bucket)
+        self.length[start] = length
+        bucket.append(start)
+        self.run_of[start:start + length] = start
+
+    def remove_run(self, start):
+        length = self.length.pop(start)
+        bucket = self.by_length[length]
+        idx = self.position.pop(start)
+        last = bucket.pop()
+        if last != start:
+            bucket[idx] = last
+            self.position[last] = idx
+        self.run_of[start:start + length] = EMPTY
+        return length
+
+    def draw(self, sks, rng=None):
+        # Pilih posisi awal secara seragam dari semua blok kosong sepanjang sks
+        rng = rng or random
+        lengths = range(sks, self.max_length + 1)
+        weights = [len(self.by_length[length]) * (length - sks + 1) for length in lengths]
+        total = sum(weights)
+        if total == 0:
+            return None
+        r = rng.randrange(total)
+        for length, weight in zip(lengths, weights):
+            if r < weight:
+                offsets = length - sks + 1
+                return self.by_length[length][r // offsets] + r % offsets
+            r -= weight
+
+    def occupy(self, pos, sks):
+        start = int(self.run_of[pos])
+        length = self.remove_run(start)
+        if pos > start:
+            self.add_run(start, pos - start)
+        if pos + sks < start + length:
+            self.add_run(pos + sks, start + length - pos - sks)
+
+class ResourceOccupancy:
+    # Bitset okupansi per dosen dan per kelas selama konstruksi jadwal. Dosen
+    # dianggap sibuk tanpa memandang mata kuliah (lebih ketat dari penalti),
+    # cukup untuk memilih blok yang tidak bentrok.
+    def __init__(self, problem: ProblemSnapshot, schedule):
+        self.problem = problem
+        self.dosen = [0] * (int(problem.course_dosen.max()) + 1)
+        self.klass = [0] * (int(problem.course_class.max()) + 1)
+        for s in np.flatnonzero(schedule != EMPTY).tolist():
+            self.occupy(int(schedule[s]), s, 1)
+
+    def clashes(self, tid, pos, sks):
+        p = self.problem
+        bits = 0
+        for s in range(pos, pos + sks):
+            bits |= p.slot_bits[s]
+        return bool((self.dosen[p.course_dosen[tid]] | self.klass[p.course_class[tid]]) & bits)
+
+    def occupy(self, tid, pos, sks):
+        p = self.problem
+        bits = 0
+        for s in range(pos, pos + sks):
+            bits |= p.slot_overlap_bits[s]
+        self.dosen[p.course_dosen[tid]] |= bits
+        self.klass[p.course_class[tid]] |= bits
+
+def create_random_schedule(problem: ProblemSnapshot, rng=None):
+    return fill_schedule(problem, empty_schedule(problem), rng)
+
+def fill_schedule(problem: ProblemSnapshot, schedule, rng=None):
+    # Tempatkan secara acak semua mata kuliah yang belum ada di jadwal. Blok
+    # yang membuat dosen/kelas bentrok diundi ulang hingga PLACEMENT_ATTEMPTS kali.
+    # rng: random.Random milik run; None = modul random global
+    rng = rng or random
+    free_blocks = FreeBlockIndex(problem, schedule)
+    occupancy = ResourceOccupancy(problem, schedule)
+    course_list = problem.course_list
+    placed = set(np.unique(schedule).tolist())
+
+    for i in rng.sample(range(len(course_list)), len(course_list)):
+        temp_id, sks, mata_kuliah, dosen, kelas = course_list[i]
+        if temp_id in placed:
+            continue
+
+        pos = None
+        for _ in range(PLACEMENT_ATTEMPTS):
+            pos = free_blocks.draw(sks, rng)
+            if pos is None or not occupancy.clashes(temp_id, pos, sks):
+                break
+        if pos is not None:
+            schedule[pos:pos+sks] = temp_id
+            free_blocks.occupy(pos, sks)
+            occupancy.occupy(temp_id, pos, sks)
+        else:
+            print(f"Gagal menempatkan: {kelas} - {mata_kuliah} - {dosen}")
+    
+    return schedule
+
+def warm_start_placements(problem: ProblemSnapshot, previous_slots):
+    # Petakan jadwal sebelumnya (format output.json) ke slot dan temp_id saat ini.
+    # Blok dipertahankan hanya bila semua slotnya masih ada, jumlahnya sama dengan
+    # sks saat ini, masih berurutan dalam satu hari & ruang, dan tidak bertumpuk.
+    slot_lookup = {
+        (str(problem.hari_names[h]), str(problem.ruang_names[r]),
+         str(problem.jam_mulai[j]), str(problem.jam_selesai[j])): idx
+        for idx, (h, r, j) in enumerate(zip(problem.slot_hari, problem.slot_ruang, problem.slot_jam))
+    }
+    course_lookup = defaultdict(list)
+    for tid, course in problem.courses.items():
+        course_lookup[(str(course['id_mk']), str(course['id_dosen']), str(course['kelas']))].append(tid)
+
+    blocks = defaultdict(list)
+    for slot in previous_slots:
+        if slot.get('temp_id') is None:
+            continue
+        key = (str(slot['id_mk']), str(slot['id_dosen']), str(slot['kelas']))
+        blocks[(key, slot['temp_id'])].append(slot_lookup.get(
+            (str(slot['hari']), str(slot['ruang']), str(slot['jam_mulai']), str(slot['jam_selesai']))
+        ))
+
+    placements = {}
+    taken = set()
+    for (key, _), slots in blocks.items():
+        candidates = [tid for tid in course_lookup.get(key, []) if tid not in placements]
+        if not candidates or None in slots:
+            continue
+        tid = candidates[0]
+        sks = problem.courses[tid]['sks']
+        slots = sorted(slots)
+        if len(slots) != sks or slots[-1] - slots[0] != sks - 1 or taken.intersection(slots):
+            continue
+        if problem.slot_group[slots[0]] != problem.slot_group[slots[-1]]:
+            continue
+        placements[tid] = slots
+        taken.update(slots)
+    return placements
+
+def create_warm_schedule(problem: ProblemSnapshot, placements, rng=None):
+    # Jadwal dari penempatan lama; mata kuliah baru/berubah ditempatkan acak
+    schedule = empty_schedule(problem)
+    for tid, slots in placements.items():
+        schedule[slots] = tid
+    return fill_schedule(problem, schedule, rng)
+
+def schedule_to_slots(schedule, problem: ProblemSnapshot, conflicts=None):
+    # Dekode jadwal integer ke format dict lama (output.json dan /schedule)
+    preference_ids = conflicts.get('preference_conflict_temp_ids', set()) if conflicts else set()
+    conflict_ids = conflicts.get('conflict_temp_ids', set()) if conflicts else set()
+    slots = []
+    for idx in range(problem.n_slots):
+        tid = int(schedule[idx])
+        course = problem.courses.get(tid) if tid != EMPTY else None
+        status = None
+        if course is not None:
+            if tid in preference_ids:
+                status = "yellow"
+            elif tid in conflict_ids:
+                status = "red"
+        slot = {
+            "id_slot": idx + 1,
+            "id_mk": None,
+            "mata_kuliah": None,
+            "id_dosen": None,
+            "dosen": None,
+            "ruang": problem.ruang_names[problem.slot_ruang[idx]],
+            "hari": problem.hari_names[problem.slot_hari[idx]],
+            "jam_mulai": problem.jam_mulai[problem.slot_jam[idx]],
+            "jam_selesai": problem.jam_selesai[problem.slot_jam[idx]],
+            "semester": None,
+            "kelas": None,
+            "sks": None,
+            "metode": None,
+            "status": status,
+            "temp_id": None
+        }
+        if course is not None:
+            slot.update(course)
+        slots.append(slot)
+    return slots
+
+def overlapping_pairs(group, start, end, order_key):
+    # Urutkan per (grup, jam mulai); untuk setiap slot i, slot j setelahnya
+    # di grup yang sama bentrok selama mulai_j < selesai_i. Batas j dicari
+    # dengan searchsorted sehingga hanya pasangan bentrok yang dibentuk.
+    if len(group) < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    order = np.lexsort((order_key, start, group))
+    g = group[order]
+    span = int(end.max()) + 1
+    key = g * span + start[order]
+    upper = np.searchsorted(key, g * span + end[order], side='left')
+    position = np.arange(len(order))
+    n_pairs = np.maximum(upper - position - 1, 0)
+    first = np.repeat(position, n_pairs)
+    offset = np.arange(n_pairs.sum()) - np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs)
+    second = first + 1 + offset
+    return order[first], order[second]
+
+def free_block_starts(problem: ProblemSnapshot, schedule, sks, max_gap=0, busy=None):
+    # Semua posisi awal blok sepanjang sks yang kosong, dalam satu hari & ruang,
+    # dan jedanya <= max_gap. Dihitung sekaligus dengan jumlah kumulatif sehingga
+    # tiap jendela dicek O(1), bukan memindai slot per posisi.
+    # busy: mask slot tambahan yang harus dihindari (mis. dosen/kelas sibuk)
+    n_starts = len(schedule) - sks + 1
+    if n_starts <= 0:
+        return []
+    starts = np.arange(n_starts)
+    occupied = schedule != EMPTY
+    if busy is not None:
+        occupied = occupied | busy
+    occupied = np.concatenate(([0], np.cumsum(occupied)))
+    wide_gap = np.concatenate(([0], np.cumsum(problem.slot_gap > max_gap)))
+    fits = ((occupied[starts + sks] == occupied[starts]) &
+            (problem.slot_group[starts] == problem.slot_group[starts + sks - 1]) &
+            (wide_gap[starts + sks] == wide_gap[starts + 1]))
+    return starts[fits].tolist()
+
+def collect_conflicts(schedule, problem: ProblemSnapshot, temp_ids=None):
+    # temp_ids: bila sudah diketahui (mis. dari FitnessTracker), pemeriksaan
+    # bentrok (A, B, C, E) cukup pada slot mata kuliah tersebut; slot lain
+    # tidak mungkin membentuk pasangan bentrok. Preferensi tetap diperiksa penuh.
     conflict_temp_ids = set()
-    lecturer_preferences = get_lecturer_preferences(db)
-    prodi_prefs = get_prodi_preferences(db)
-    preference_conflict_temp_ids = set()
+
+    all_slot_idx = np.flatnonzero(schedule != EMPTY)
+    all_tids = schedule[all_slot_idx].astype(np.int64)
+    if temp_ids is None:
+        slot_idx, tids = all_slot_idx, all_tids
+    else:
+        mask = np.isin(all_tids, list(temp_ids))
+        slot_idx, tids = all_slot_idx[mask], all_tids[mask]
+    hari = problem.slot_hari[slot_idx]
+    ruang = problem.slot_ruang[slot_idx]
+    start = problem.slot_start[slot_idx]
+    end = problem.slot_end[slot_idx]
+    n_hari = len(problem.hari_names)
+    n_ruang = len(problem.ruang_names)
+
+    def pair_conflicts(group, differ=None):
+        first, second = overlapping_pairs(group, start, end, slot_idx)
+        if differ is not None:
+            keep = differ[first] != differ[second]
+            first, second = first[keep], second[keep]
+        conflict_temp_ids.update(tids[first].tolist())
+        conflict_temp_ids.update(tids[second].tolist())
+        return list(zip((slot_idx[first] + 1).tolist(), (slot_idx[second] + 1).tolist()))
 
     # (A) Konsistensi Ruangan
-    temp_groups = defaultdict(list)
-    for slot in schedule:
-        if slot['mata_kuliah'] is not None and slot.get('temp_id') is not None:
-            temp_groups[slot['temp_id']].append(slot)
     room_consistency_conflicts = []
-    for tid, slots in temp_groups.items():
-        if len({slot['ruang'] for slot in slots}) > 1:
-            conflict_temp_ids.add(tid)
-            room_consistency_conflicts.append({
-                'temp_id': tid,
-                'ruangan': list({slot['ruang'] for slot in slots}),
-                'slot_ids': [slot['id_slot'] for slot in slots]
-            })
+    rooms_per_tid = np.bincount(np.unique(tids * n_ruang + ruang) // n_ruang,
+                                minlength=problem.n_courses)
+    for tid in np.flatnonzero(rooms_per_tid > 1).tolist():
+        mask = tids == tid
+        conflict_temp_ids.add(tid)
+        room_consistency_conflicts.append({
+            'temp_id': tid,
+            'ruangan': list({problem.ruang_names[r] for r in ruang[mask]}),
+            'slot_ids': (slot_idx[mask] + 1).tolist()
+        })
     
     # (B) Konflik Dosen
-    teacher_conflicts = []
-    teacher_groups = defaultdict(list)
-    for slot in schedule:
-        if slot['mata_kuliah'] is None:
-            continue
-        teacher_groups[(slot['dosen'], slot['hari'].lower())].append(slot)
-    for slots in teacher_groups.values():
-        slots.sort(key=lambda s: time_to_minutes(s['jam_mulai']))
-        for i in range(len(slots)):
-            for j in range(i+1, len(slots)):
-                if time_to_minutes(slots[j]['jam_mulai']) < time_to_minutes(slots[i]['jam_selesai']) \
-                   and slots[i]['mata_kuliah'] != slots[j]['mata_kuliah']:
-                    for tid in (slots[i].get('temp_id'), slots[j].get('temp_id')):
-                        if tid is not None:
-                            conflict_temp_ids.add(tid)
-                    teacher_conflicts.append((slots[i]['id_slot'], slots[j]['id_slot']))
+    teacher_conflicts = pair_conflicts(
+        problem.course_dosen[tids] * n_hari + hari,
+        differ=problem.course_mk[tids]
+    )
 
     # (C) Konflik Ruangan
-    room_conflicts = []
-    room_groups = defaultdict(list)
-    for slot in schedule:
-        if slot['mata_kuliah'] is None:
-            continue
-        room_groups[(slot['ruang'], slot['hari'].lower())].append(slot)
-    for slots in room_groups.values():
-        slots.sort(key=lambda s: time_to_minutes(s['jam_mulai']))
-        for i in range(len(slots)):
-            for j in range(i+1, len(slots)):
-                if time_to_minutes(slots[j]['jam_mulai']) < time_to_minutes(slots[i]['jam_selesai']) \
-                   and slots[i]['kelas'] != slots[j]['kelas']:
-                    for tid in (slots[i].get('temp_id'), slots[j].get('temp_id')):
-                        if tid is not None:
-                            conflict_temp_ids.add(tid)
-                    room_conflicts.append((slots[i]['id_slot'], slots[j]['id_slot']))
+    room_conflicts = pair_conflicts(
+        ruang * n_hari + hari,
+        differ=problem.course_kelas[tids]
+    )
 
     # (D) Konflik Preferensi Dosen
-    for slot in schedule:
-        if slot['mata_kuliah'] is None:
-            continue
-        tid = slot.get('temp_id')
-        dosen = str(slot['dosen'])
-        slot_day = slot['hari'].lower()
-        slot_start = time_to_minutes(slot['jam_mulai'])
-        if dosen in lecturer_preferences:
-            prefs = lecturer_preferences[dosen]
-            restricted_days = [day.lower() for day in prefs['restricted_days']] if prefs['restricted_days'] else []
-            if restricted_days and slot_day in restricted_days:
-                if tid is not None:
-                    preference_conflict_temp_ids.add(tid)
-                continue
-            if prefs['time_range']:
-                allowed_start = time_to_minutes(prefs['time_range'][0])
-                allowed_end = time_to_minutes(prefs['time_range'][1])
-                if slot_start < allowed_start or slot_start >= allowed_end:
-                    if tid is not None:
-                        preference_conflict_temp_ids.add(tid)
+    dosen_violation = problem.dosen_preference_violation[problem.course_dosen[all_tids], all_slot_idx]
 
     # (E) Konflik Kelas
-    class_conflicts = []
-    class_groups = defaultdict(list)
-    for slot in schedule:
-        if slot['mata_kuliah'] is None:
-            continue
-        class_groups[(slot['kelas'], slot['hari'].lower(), slot['semester'])].append(slot)
-    for slots in class_groups.values():
-        slots.sort(key=lambda s: time_to_minutes(s['jam_mulai']))
-        for i in range(len(slots)):
-            for j in range(i+1, len(slots)):
-                if time_to_minutes(slots[j]['jam_mulai']) < time_to_minutes(slots[i]['jam_selesai']):
-                    for tid in (slots[i].get('temp_id'), slots[j].get('temp_id')):
-                        if tid is not None:
-                            conflict_temp_ids.add(tid)
-                    class_conflicts.append((slots[i]['id_slot'], slots[j]['id_slot']))
+    class_conflicts = pair_conflicts(problem.course_class[tids] * n_hari + hari)
     
     # (F) Konflik Preferensi Prodi
-    for slot in schedule:
-        if slot['mata_kuliah'] is None:
-            continue
-
-        tid = slot.get('temp_id')
-        slot_day = slot['hari'].lower()
-        slot_start = time_to_minutes(slot['jam_mulai'])
-        
-        # Cek hari terlarang prodi
-        restricted_days = [day.lower() for day in prodi_prefs.get('restricted_days', [])]
-        restricted_time_ranges = prodi_prefs.get('restricted_time_ranges', [])
-        
-        # Iterasi semua rentang waktu terlarang prodi
-        for time_range in restricted_time_ranges:
-            restricted_start = time_to_minutes(time_range[0])
-            restricted_end = time_to_minutes(time_range[1])
-            
-            if (
-                slot_day in restricted_days and
-                restricted_start <= slot_start < restricted_end
-            ):
-                if tid is not None:
-                    preference_conflict_temp_ids.add(tid)
+    prodi_violation = problem.prodi_preference_violation[all_slot_idx]
+    preference_conflict_temp_ids = set(all_tids[dosen_violation | prodi_violation].tolist())
 
     return {
         'class_conflicts': class_conflicts,
@@ -326,8 +619,8 @@ def collect_conflicts(schedule, db: Session):
         'room_consistency_conflicts': room_consistency_conflicts
     }
 
-def calculate_fitness(schedule, db: Session):
-    conflicts = collect_conflicts(schedule, db)
+def calculate_fitness(schedule, problem: ProblemSnapshot):
+    conflicts = collect_conflicts(schedule, problem)
     penalty = (len(conflicts['teacher_conflicts']) +
                len(conflicts['room_conflicts']) +
                len(conflicts['room_consistency_conflicts']) +
@@ -335,145 +628,928 @@ def calculate_fitness(schedule, db: Session):
                0.5 * len(conflicts['preference_conflict_temp_ids']))
     return penalty
 
+def count_overlap_pairs(counts, jam_overlap):
+    # Jumlah pasangan slot dalam grup yang sama dengan jam beririsan
+    counts = counts.reshape(-1, counts.shape[-1]).astype(np.int64)
+    total = np.einsum('gj,jk,gk->', counts, jam_overlap, counts)
+    return int(total - (counts * np.diag(jam_overlap)).sum()) // 2
+
+class SlotIndex:
+    # Indeks balik temp_id -> indeks slot, sinkron dengan penempatan/penghapusan
+    # sehingga pencarian blok sebuah mata kuliah cukup O(sks).
+    def __init__(self, n_courses, width):
+        self.slots = np.full((n_courses, max(1, width)), EMPTY, dtype=np.int32)
+        self.count = np.zeros(n_courses, dtype=np.int32)
+
+    def load(self, schedule):
+        slot_idx = np.flatnonzero(schedule != EMPTY)
+        tids = schedule[slot_idx].astype(np.int64)
+        counts = np.bincount(tids, minlength=len(self.count))
+        if counts.max(initial=0) > self.slots.shape[1]:
+            self.slots = np.full((len(self.count), counts.max()), EMPTY, dtype=np.int32)
+        order = np.argsort(tids, kind='stable')
+        tids, slot_idx = tids[order], slot_idx[order]
+        starts = np.cumsum(counts) - counts
+        self.slots[tids, np.arange(len(tids)) - starts[tids]] = slot_idx
+        self.count = counts.astype(np.int32)
+
+    def of(self, tid):
+        return self.slots[tid, :self.count[tid]].tolist()
+
+    def add(self, tid, s):
+        n = self.count[tid]
+        if n == self.slots.shape[1]:
+            self.slots = np.pad(self.slots, ((0, 0), (0, 1)), constant_values=EMPTY)
+        self.slots[tid, n] = s
+        self.count[tid] = n + 1
+
+    def remove(self, tid, s):
+        n = self.count[tid] - 1
+        row = self.slots[tid]
+        i = int(np.flatnonzero(row[:n + 1] == s)[0])
+        row[i] = row[n]
+        row[n] = EMPTY
+        self.count[tid] = n
+
+    def copy(self):
+        other = SlotIndex.__new__(SlotIndex)
+        other.slots = self.slots.copy()
+        other.count = self.count.copy()
+        return other
+
+class FitnessTracker:
+    # Penalti inkremental: penghitung okupansi per (dosen|ruang|kelas, hari, jam)
+    # sehingga memindahkan satu blok mata kuliah cukup memperbarui O(sks) sel.
+    ARRAYS = ('teacher', 'teacher_mk', 'room', 'room_kelas', 'klass',
+              'tid_room', 'tid_rooms', 'tid_preference')
+
+    def __init__(self, problem: ProblemSnapshot, schedule=None):
+        self.problem = problem
+        n_hari, n_ruang, n_jam = len(problem.hari_names), len(problem.ruang_names), len(problem.jam_mulai)
+        self.teacher = np.zeros((problem.course_dosen.max() + 1, n_hari, n_jam), dtype=np.int32)
+        self.teacher_mk = np.zeros((problem.course_dosen_mk.max() + 1, n_hari, n_jam), dtype=np.int32)
+        self.room = np.zeros((n_ruang, n_hari, n_jam), dtype=np.int32)
+        self.room_kelas = np.zeros((n_ruang, problem.course_kelas.max() + 1, n_hari, n_jam), dtype=np.int32)
+        self.klass = np.zeros((problem.course_class.max() + 1, n_hari, n_jam), dtype=np.int32)
+        self.tid_room = np.zeros((problem.n_courses, n_ruang), dtype=np.int32)
+        self.tid_rooms = np.zeros(problem.n_courses, dtype=np.int32)
+        self.tid_preference = np.zeros(problem.n_courses, dtype=np.int32)
+        self.teacher_pairs = 0
+        self.room_pairs = 0
+        self.class_pairs = 0
+        self.room_consistency = 0
+        self.preference = 0
+        self.fingerprint = 0
+        self.slot_index = SlotIndex(problem.n_courses, max((course['sks'] for course in problem.courses.values()), default=1))
+        if schedule is not None:
+            self.load(schedule)
+
+    def load(self, schedule):
+        p = self.problem
+        slot_idx = np.flatnonzero(schedule != EMPTY)
+        tids = schedule[slot_idx].astype(np.int64)
+        hari, ruang, jam = p.slot_hari[slot_idx], p.slot_ruang[slot_idx], p.slot_jam[slot_idx]
+        np.add.at(self.teacher, (p.course_dosen[tids], hari, jam), 1)
+        np.add.at(self.teacher_mk, (p.course_dosen_mk[tids], hari, jam), 1)
+        np.add.at(self.room, (ruang, hari, jam), 1)
+        np.add.at(self.room_kelas, (ruang, p.course_kelas[tids], hari, jam), 1)
+        np.add.at(self.klass, (p.course_class[tids], hari, jam), 1)
+        np.add.at(self.tid_room, (tids, ruang), 1)
+        np.add.at(self.tid_preference, tids, p.preference_violation(tids, slot_idx))
+        self.tid_rooms = (self.tid_room > 0).sum(axis=1).astype(np.int32)
+
+        self.teacher_pairs = (count_overlap_pairs(self.teacher, p.jam_overlap) -
+                              count_overlap_pairs(self.teacher_mk, p.jam_overlap))
+        self.room_pairs = (count_overlap_pairs(self.room, p.jam_overlap) -
+                           count_overlap_pairs(self.room_kelas, p.jam_overlap))
+        self.class_pairs = count_overlap_pairs(self.klass, p.jam_overlap)
+        self.room_consistency = int((self.tid_rooms > 1).sum())
+        self.preference = int((self.tid_preference > 0).sum())
+        self.slot_index.load(schedule)
+        self.fingerprint = schedule_fingerprint(p, schedule)
+
+    def __getstate__(self):
+        # problem tidak ikut dipickle ke worker; dipasang ulang oleh penerima
+        state = self.__dict__.copy()
+        state['problem'] = None
+        return state
+
+    def copy(self):
+        other = FitnessTracker.__new__(FitnessTracker)
+        other.__dict__.update(self.__dict__)
+        for name in self.ARRAYS:
+            setattr(other, name, getattr(self, name).copy())
+        other.slot_index = self.slot_index.copy()
+        return other
+
+    def breakdown(self):
+        # Rincian penalti per kategori (jumlah pasangan bentrok / mata kuliah)
+        return {
+            "teacher_conflicts": int(self.teacher_pairs),
+            "room_conflicts": int(self.room_pairs),
+            "class_conflicts": int(self.class_pairs),
+            "room_consistency_conflicts": int(self.room_consistency),
+            "preference_conflicts": int(self.preference)
+        }
+
+    @property
+    def penalty(self):
+        return (self.teacher_pairs +
+                self.room_pairs +
+                self.room_consistency +
+                self.class_pairs +
+                0.5 * self.preference)
+
+    def _pairs_with(self, tid, s):
+        # Jumlah pasangan bentrok antara slot s (mata kuliah tid) dan isi penghitung
+        p = self.problem
+        d, dm, k, c = p.course_dosen[tid], p.course_dosen_mk[tid], p.course_kelas[tid], p.course_class[tid]
+        h, r = p.slot_hari[s], p.slot_ruang[s]
+        teacher = room = klass = 0
+        for j in p.jam_overlaps[p.slot_jam[s]]:
+            teacher += self.teacher[d, h, j] - self.teacher_mk[dm, h, j]
+            room += self.room[r, h, j] - self.room_kelas[r, k, h, j]
+            klass += self.klass[c, h, j]
+        return int(teacher), int(room), int(klass)
+
+    def busy_slots(self, tid):
+        # Mask slot yang jamnya beririsan dengan jadwal dosen (mata kuliah lain)
+        # atau kelas dari tid; tid sendiri sebaiknya sudah dihapus dari penghitung
+        p = self.problem
+        busy = ((self.teacher[p.course_dosen[tid]] - self.teacher_mk[p.course_dosen_mk[tid]]) +
+                self.klass[p.course_class[tid]]) > 0
+        busy = (busy.astype(np.int64) @ p.jam_overlap) > 0
+        return busy[p.slot_hari, p.slot_jam]
+
+    def _update(self, tid, s, step):
+        p = self.problem
+        h, r, j = p.slot_hari[s], p.slot_ruang[s], p.slot_jam[s]
+        self.teacher[p.course_dosen[tid], h, j] += step
+        self.teacher_mk[p.course_dosen_mk[tid], h, j] += step
+        self.room[r, h, j] += step
+        self.room_kelas[r, p.course_kelas[tid], h, j] += step
+        self.klass[p.course_class[tid], h, j] += step
+
+    def add(self, tid, slots):
+        p = self.problem
+        for s in slots:
+            teacher, room, klass = self._pairs_with(tid, s)
+            self.teacher_pairs += teacher
+            self.room_pairs += room
+            self.class_pairs += klass
+            self._update(tid, s, 1)
+            self.slot_index.add(tid, s)
+            self.fingerprint ^= fingerprint_term(p, tid, s)
+            r = p.slot_ruang[s]
+            if self.tid_room[tid, r] == 0:
+                self.tid_rooms[tid] += 1
+                if self.tid_rooms[tid] == 2:
+                    self.room_consistency += 1
+            self.tid_room[tid, r] += 1
+            if p.preference_violation(tid, s):
+                if self.tid_preference[tid] == 0:
+                    self.preference += 1
+                self.tid_preference[tid] += 1
+
+    def remove(self, tid, slots):
+        p = self.problem
+        for s in slots:
+            self._update(tid, s, -1)
+            self.slot_index.remove(tid, s)
+            self.fingerprint ^= fingerprint_term(p, tid, s)
+            teacher, room, klass = self._pairs_with(tid, s)
+            self.teacher_pairs -= teacher
+            self.room_pairs -= room
+            self.class_pairs -= klass
+            r = p.slot_ruang[s]
+            self.tid_room[tid, r] -= 1
+            if self.tid_room[tid, r] == 0:
+                self.tid_rooms[tid] -= 1
+                if self.tid_rooms[tid] == 1:
+                    self.room_consistency -= 1
+            if p.preference_violation(tid, s):
+                self.tid_preference[tid] -= 1
+                if self.tid_preference[tid] == 0:
+                    self.preference -= 1
+
+    def conflict_temp_ids(self, schedule):
+        # Sama dengan collect_conflicts(...)['conflict_temp_ids'], dibaca dari penghitung
+        p = self.problem
+        slot_idx = np.flatnonzero(schedule != EMPTY)
+        tids = schedule[slot_idx].astype(np.int64)
+        hari, ruang, jam = p.slot_hari[slot_idx], p.slot_ruang[slot_idx], p.slot_jam[slot_idx]
+        overlap = p.jam_overlap[jam]
+        teacher = self.teacher[p.course_dosen[tids], hari] - self.teacher_mk[p.course_dosen_mk[tids], hari]
+        room = self.room[ruang, hari] - self.room_kelas[ruang, p.course_kelas[tids], hari]
+        klass = self.klass[p.course_class[tids], hari]
+        clash = (((teacher + room + klass) * overlap).sum(axis=1) -
+                 p.jam_overlap[jam, jam]) > 0
+        conflicted = set(tids[clash].tolist())
+        conflicted.update(np.flatnonzero(self.tid_rooms > 1).tolist())
+        return conflicted
+
+class ScheduleJournal:
+    # Jurnal perubahan jadwal beserta tracker-nya: langkah percobaan dapat
+    # dibatalkan ke titik mark() tanpa menyalin seluruh jadwal.
+    def __init__(self, schedule, tracker):
+        self.schedule = schedule
+        self.tracker = tracker
+        self.changes = []
+
+    def mark(self):
+        return len(self.changes)
+
+    def place(self, tid, slots):
+        slots = list(slots)
+        self.schedule[slots] = tid
+        self.tracker.add(tid, slots)
+        self.changes.append((tid, slots, True))
+        return slots
+
+    def remove(self, tid, slots):
+        slots = list(slots)
+        self.schedule[slots] = EMPTY
+        self.tracker.remove(tid, slots)
+        self.changes.append((tid, slots, False))
+        return slots
+
+    def rollback(self, mark=0):
+        while len(self.changes) > mark:
+            tid, slots, placed = self.changes.pop()
+            if placed:
+                self.schedule[slots] = EMPTY
+                self.tracker.remove(tid, slots)
+            else:
+                self.schedule[slots] = tid
+                self.tracker.add(tid, slots)
+
+class FitnessCache:
+    # LRU hasil evaluasi konflik per sidik jari jadwal. Serigala yang tidak
+    # berubah (atau jadwal yang sama persis) tidak dipindai ulang.
+    # max_entries = 0 menonaktifkan cache.
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def conflict_temp_ids(self, schedule, tracker, timer):
+        key = tracker.fingerprint
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            timer.count('fitness_cache_hits')
+            return self.entries[key]
+        timer.count('fitness_cache_misses')
+        conflicts = tuple(sorted(tracker.conflict_temp_ids(schedule)))
+        if self.max_entries > 0:
+            self.entries[key] = conflicts
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return conflicts
+
+    def memory_bytes(self):
+        return sum(sys.getsizeof(conflicts) for conflicts in self.entries.values())
+
+class PhaseTimer:
+    # Akumulasi waktu (detik) dan jumlah panggilan per fase optimasi
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        # Penghitung lain tanpa durasi, mis. hit/miss cache fitness
+        self.counters = defaultdict(int)
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - started
+            self.calls[name] += 1
+
+    def totals(self):
+        return {name: (self.seconds[name], self.calls[name]) for name in self.seconds}
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def merge(self, other):
+        # Gabungkan timer dari worker proses
+        for name, seconds in other.seconds.items():
+            self.seconds[name] += seconds
+            self.calls[name] += other.calls[name]
+        for name, n in other.counters.items():
+            self.counters[name] += n
+
+    @property
+    def evaluations(self):
+        # Setiap serigala baru (restart) atau yang dipindah dihitung satu evaluasi
+        return self.calls['fitness'] + self.calls['update_position']
+
+    def snapshot(self):
+        return time.monotonic(), dict(self.seconds), self.evaluations, dict(self.counters)
+
+    def hit_rate(self, since=None):
+        hits = self.counters['fitness_cache_hits'] - (since or {}).get('fitness_cache_hits', 0)
+        misses = self.counters['fitness_cache_misses'] - (since or {}).get('fitness_cache_misses', 0)
+        return round(hits / (hits + misses), 4) if hits + misses else None
+
+# State per proses worker, diisi sekali oleh init_worker
+worker_state = {}
+
+def init_worker(problem, create_solution_function, fitness_cache_size=1024):
+    worker_state['gwo'] = GreyWolfOptimizer(problem=problem, fitness_cache_size=fitness_cache_size)
+    worker_state['create'] = create_solution_function
+
+def worker_step(solution, tracker, alpha, beta, delta, a, restart, seed):
+    # Tiap tugas membawa seed sendiri agar hasil tidak bergantung pada worker mana
+    # yang mengerjakannya
+    gwo = worker_state['gwo']
+    gwo.rng = random.Random(seed)
+    gwo.timer = PhaseTimer()
+    if tracker is not None:
+        tracker.problem = gwo.problem
+    new_solution, new_tracker = gwo.step(solution, tracker, alpha, beta, delta, a, restart, worker_state['create'])
+    return new_solution, new_tracker, gwo.timer
+
+def island_epoch(population, trackers, population_size, a_values, seed, time_limit, target_fitness):
+    # Satu epoch model pulau: beberapa iterasi GWO penuh di dalam worker.
+    # Populasi yang belum lengkap (epoch pertama) dilengkapi dengan jadwal acak.
+    gwo = worker_state['gwo']
+    gwo.rng = random.Random(seed)
+    gwo.timer = PhaseTimer()
+    gwo.target_fitness = target_fitness
+    population = list(population)
+    trackers = list(trackers)
+    for tracker in trackers:
+        tracker.problem = gwo.problem
+    for solution in population[len(trackers):]:
+        with gwo.timer.phase('fitness'):
+            trackers.append(FitnessTracker(gwo.problem, solution))
+    while len(population) < population_size:
+        solution, tracker = gwo.step(None, None, None, None, None, None, True, worker_state['create'])
+        population.append(solution)
+        trackers.append(tracker)
+    population, trackers, iterations, best = gwo.evolve(population, trackers, a_values, worker_state['create'], time_limit)
+    return population, trackers, iterations, best, gwo.timer
+
 class GreyWolfOptimizer:
-    def __init__(self, population_size=10, max_iterations=50):
+    def __init__(self, population_size=10, max_iterations=50, problem=None, workers=1,
+                 yield_interval=0.05, log_interval=0.0, polish_seconds=0.0,
+                 time_limit_seconds=None, target_fitness=0.0, stagnation_iterations=None,
+                 islands=1, migration_interval=10, initial_solutions=None, seed=None,
+                 fitness_cache_size=1024):
         self.population_size = population_size
         self.max_iterations = max_iterations
+        self.problem = problem
+        self.workers = workers
+        # Detik antar penyerahan kendali ke event loop dan antar log iterasi
+        self.yield_interval = yield_interval
+        self.log_interval = log_interval
+        # Batas waktu (detik) pencarian lokal setelah GWO, 0 = tidak dijalankan
+        self.polish_seconds = polish_seconds
+        # Kriteria berhenti: batas waktu total (detik), fitness yang sudah cukup
+        # baik, dan jumlah iterasi tanpa perbaikan
+        self.time_limit_seconds = time_limit_seconds
+        self.target_fitness = target_fitness
+        self.stagnation_iterations = stagnation_iterations
+        # Model pulau: populasi independen per proses, serigala terbaik
+        # dipertukarkan setiap migration_interval iterasi
+        self.islands = islands
+        self.migration_interval = migration_interval
+        # Jadwal awal (warm start) yang menggantikan sebagian populasi acak
+        self.initial_solutions = list(initial_solutions or [])
+        # Generator acak milik run ini; seed yang sama memberi hasil yang sama
+        # (selama tidak dihentikan oleh batas waktu)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.timer = PhaseTimer()
+        self.metrics_callback = None
+        self.fitness_cache = FitnessCache(fitness_cache_size)
+
+    def step(self, solution, tracker, alpha, beta, delta, a, restart, create_solution_function):
+        if restart:
+            with self.timer.phase('create_solution'):
+                new_solution = create_solution_function(self.rng)
+            with self.timer.phase('fitness'):
+                return new_solution, FitnessTracker(self.problem, new_solution)
+        with self.timer.phase('update_position'):
+            return self.update_position(solution, tracker, alpha, beta, delta, a, create_solution_function)
+
+    async def step_population(self, executor, population, trackers, alpha, beta, delta, a, restarts, create_solution_function):
+        if executor is None:
+            return [
+                self.step(population[i], trackers[i], alpha, beta, delta, a, restarts[i], create_solution_function)
+                for i in range(len(population))
+            ]
+        loop = asyncio.get_running_loop()
+        seeds = [self.rng.getrandbits(64) for _ in population]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, worker_step, population[i], trackers[i], alpha, beta, delta, a, restarts[i], seeds[i])
+            for i in range(len(population))
+        ))
+        for _, tracker, timer in results:
+            tracker.problem = self.problem
+            self.timer.merge(timer)
+        return [(solution, tracker) for solution, tracker, _ in results]
         
-    async def optimize(self, fitness_function, create_solution_function, collect_conflicts_func, log_callback=None):
-        population = [create_solution_function() for _ in range(self.population_size)]
-        fitness_values = [fitness_function(solution) for solution in population]
+    async def optimize(self, create_solution_function, collect_conflicts_func, log_callback=None, progress_callback=None,
+                       metrics_callback=None):
+        # metrics_callback menerima event dict per iterasi ("iteration") dan di akhir ("summary")
+        self.metrics_callback = metrics_callback
+        self.timer = PhaseTimer()
+        if self.islands > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self.islands,
+                initializer=init_worker,
+                initargs=(self.problem, create_solution_function, self.fitness_cache.max_entries)
+            )
+            try:
+                return await self.run_islands(executor, collect_conflicts_func, log_callback, progress_callback)
+            finally:
+                executor.shutdown()
+        executor = None
+        if self.workers > 1:
+            # Data statis dikirim sekali saat worker dibuat, bukan per tugas
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.problem, create_solution_function, self.fitness_cache.max_entries)
+            )
+        try:
+            return await self.run(executor, create_solution_function, collect_conflicts_func, log_callback, progress_callback)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def remaining_time(self, started):
+        if self.time_limit_seconds is None:
+            return float('inf')
+        return self.time_limit_seconds - (time.monotonic() - started)
+
+    def polish_reserve(self):
+        # Sebagian batas waktu disisihkan untuk pencarian lokal
+        if self.time_limit_seconds and self.polish_seconds > 0:
+            return min(self.polish_seconds, self.time_limit_seconds / 2)
+        return 0.0
+
+    def exploration(self, iteration, started):
+        # a turun dari 2 ke 0 mengikuti anggaran yang lebih dulu habis: iterasi atau waktu
+        progress = iteration / self.max_iterations
+        if self.time_limit_seconds:
+            progress = max(progress, (time.monotonic() - started) / (self.time_limit_seconds - self.polish_reserve()))
+        return 2.0 * (1 - min(progress, 1.0))
+
+    def stop_reason(self, best_fitness, iteration, best_iteration, started):
+        if best_fitness <= self.target_fitness:
+            return "target fitness tercapai"
+        if self.remaining_time(started) <= self.polish_reserve():
+            return "batas waktu tercapai"
+        if self.stagnation_iterations and iteration - best_iteration >= self.stagnation_iterations:
+            return f"tidak ada perbaikan selama {self.stagnation_iterations} iterasi"
+        return None
+
+    def evolve(self, population, trackers, a_values, create_solution_function, time_limit=None):
+        # Beberapa iterasi GWO tanpa log dan tanpa executor (dipakai tiap pulau).
+        # Mengembalikan populasi baru, jumlah iterasi yang dijalankan, dan serigala
+        # terbaik selama epoch (solution, tracker, iterasi ditemukan); GWO tidak
+        # elitis sehingga serigala terbaik bisa hilang sebelum epoch selesai.
+        started = time.monotonic()
+        iterations = 0
+        best_index = min(range(len(trackers)), key=lambda i: trackers[i].penalty)
+        best = (population[best_index], trackers[best_index], 0)
+        for a in a_values:
+            fitness_values = [tracker.penalty for tracker in trackers]
+            if min(fitness_values) <= self.target_fitness:
+                break
+            if time_limit is not None and time.monotonic() - started >= time_limit:
+                break
+            sorted_indices = np.argsort(fitness_values)
+            alpha, beta, delta = (trackers[i].slot_index for i in sorted_indices[:3])
+            results = [
+                self.step(population[i], trackers[i], alpha, beta, delta, a, self.rng.random() < 0.05,
+                          create_solution_function)
+                for i in range(len(population))
+            ]
+            population = [solution for solution, _ in results]
+            trackers = [tracker for _, tracker in results]
+            iterations += 1
+            for solution, tracker in results:
+                if tracker.penalty < best[1].penalty:
+                    best = (solution, tracker, iterations)
+        return population, trackers, iterations, best
+
+    def migrate(self, populations, trackers):
+        # Topologi cincin: serigala terbaik tiap pulau menggantikan serigala
+        # terburuk di pulau berikutnya
+        migrants = []
+        for population, island_trackers in zip(populations, trackers):
+            best = int(np.argmin([tracker.penalty for tracker in island_trackers]))
+            migrants.append((population[best], island_trackers[best]))
+        for k, (solution, tracker) in enumerate(migrants):
+            target = (k + 1) % len(populations)
+            worst = int(np.argmax([t.penalty for t in trackers[target]]))
+            populations[target][worst] = solution
+            trackers[target][worst] = tracker
+
+    def iteration_metrics(self, iteration, started, since, fitness_values, best_fitness, best_tracker):
+        # Event telemetri: waktu per fase sejak event sebelumnya, laju evaluasi,
+        # rincian konflik serigala terbaik, dan sebaran fitness populasi
+        now, seconds, evaluations, counters = since
+        phases = {name: round(total - seconds.get(name, 0.0), 6) for name, total in self.timer.seconds.items()}
+        elapsed = time.monotonic() - now
+        new_evaluations = self.timer.evaluations - evaluations
+        fitness_values = np.asarray(fitness_values, dtype=float)
+        return {
+            "event": "iteration",
+            "iteration": iteration,
+            "max_iterations": self.max_iterations,
+            "best_fitness": best_fitness,
+            "elapsed_seconds": round(time.monotonic() - started, 6),
+            "iteration_seconds": round(elapsed, 6),
+            "phases": phases,
+            "evaluations": new_evaluations,
+            "evaluations_per_sec": round(new_evaluations / elapsed, 3) if elapsed > 0 else None,
+            "fitness_cache_hit_rate": self.timer.hit_rate(counters),
+            "conflicts": best_tracker.breakdown() if best_tracker is not None else None,
+            "population_fitness": {
+                "min": float(fitness_values.min()),
+                "max": float(fitness_values.max()),
+                "mean": float(fitness_values.mean()),
+                "median": float(np.median(fitness_values)),
+                "std": float(fitness_values.std())
+            }
+        }
+
+    async def run_islands(self, executor, collect_conflicts_func, log_callback=None, progress_callback=None):
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        # Jadwal warm start dibagi bergiliran ke tiap pulau
+        populations = [self.initial_solutions[k::self.islands][:self.population_size] for k in range(self.islands)]
+        trackers = [[] for _ in range(self.islands)]
+        best_solution = None
+        best_tracker = None
+        best_fitness = float('inf')
+        best_iteration = 0
+        iteration = 0
+        last_log = None
+        since = self.timer.snapshot()
+
+        while iteration < self.max_iterations:
+            count = min(self.migration_interval, self.max_iterations - iteration)
+            a_values = [self.exploration(iteration + k, started) for k in range(count)]
+            time_limit = None
+            if self.time_limit_seconds:
+                time_limit = max(0.0, self.remaining_time(started) - self.polish_reserve())
+            results = await asyncio.gather(*(
+                loop.run_in_executor(executor, island_epoch, populations[k], trackers[k], self.population_size,
+                                     a_values, self.rng.getrandbits(64), time_limit, self.target_fitness)
+                for k in range(self.islands)
+            ))
+            populations = [population for population, _, _, _, _ in results]
+            trackers = [island_trackers for _, island_trackers, _, _, _ in results]
+            for _, _, _, _, timer in results:
+                self.timer.merge(timer)
+            for island_trackers in trackers:
+                for tracker in island_trackers:
+                    tracker.problem = self.problem
+
+            # Serigala terbaik tiap pulau selama epoch, bukan hanya di akhir epoch
+            for _, _, _, (solution, tracker, found), _ in results:
+                tracker.problem = self.problem
+                if tracker.penalty < best_fitness:
+                    best_fitness = tracker.penalty
+                    best_solution = solution
+                    best_tracker = tracker
+                    best_iteration = iteration + found
+            iteration += max(1, max(done for _, _, done, _, _ in results))
+
+            stop_reason = self.stop_reason(best_fitness, iteration, best_iteration, started)
+            now = time.monotonic()
+            if log_callback and (last_log is None or iteration >= self.max_iterations or
+                                 stop_reason or now - last_log >= self.log_interval):
+                log_callback(f"Iterasi {iteration}/{self.max_iterations} - Best Fitness: {best_fitness}")
+                last_log = now
+            if progress_callback:
+                progress_callback({
+                    "iteration": iteration,
+                    "max_iterations": self.max_iterations,
+                    "best_fitness": best_fitness
+                })
+            if self.metrics_callback:
+                fitness_values = [tracker.penalty for island_trackers in trackers for tracker in island_trackers]
+                self.metrics_callback(self.iteration_metrics(
+                    iteration, started, since, fitness_values, best_fitness, best_tracker
+                ))
+                since = self.timer.snapshot()
+            if stop_reason:
+                if log_callback:
+                    log_callback(f"Berhenti di iterasi {iteration}: {stop_reason}")
+                break
+            self.migrate(populations, trackers)
+
+        return self.finish(best_solution, best_tracker, best_fitness, started, collect_conflicts_func, log_callback)
+
+    async def run(self, executor, create_solution_function, collect_conflicts_func, log_callback=None, progress_callback=None):
+        started = time.monotonic()
+        since = self.timer.snapshot()
+        # Populasi awal: jadwal warm start (bila ada), sisanya dibuat lewat
+        # jalur restart agar ikut diparalelkan
+        population = self.initial_solutions[:self.population_size]
+        with self.timer.phase('fitness'):
+            trackers = [FitnessTracker(self.problem, solution) for solution in population]
+        empty = [None] * (self.population_size - len(population))
+        results = await self.step_population(
+            executor, empty, empty, None, None, None, None, [True] * len(empty), create_solution_function
+        )
+        population += [solution for solution, _ in results]
+        trackers += [tracker for _, tracker in results]
+        fitness_values = [tracker.penalty for tracker in trackers]
         
         best_solution = None
+        best_tracker = None
         best_fitness = float('inf')
-        a_start = 2.0
+        best_iteration = 0
+        last_yield = time.monotonic()
+        last_log = None
         
         for iteration in range(self.max_iterations):
-            a = a_start - iteration * (a_start / self.max_iterations)
-            if best_fitness <= 0:
-                break
+            a = self.exploration(iteration, started)
             
             sorted_indices = np.argsort(fitness_values)
-            alpha = population[sorted_indices[0]]
-            beta = population[sorted_indices[1]]
-            delta = population[sorted_indices[2]]
+            # Pemimpin diteruskan sebagai indeks slot-nya, bukan jadwal penuh
+            alpha = trackers[sorted_indices[0]].slot_index
+            beta = trackers[sorted_indices[1]].slot_index
+            delta = trackers[sorted_indices[2]].slot_index
             if fitness_values[sorted_indices[0]] < best_fitness:
                 best_fitness = fitness_values[sorted_indices[0]]
-                best_solution = copy.deepcopy(alpha)
+                # Jadwal di populasi tidak pernah diubah di tempat, cukup dirujuk
+                best_solution = population[sorted_indices[0]]
+                best_tracker = trackers[sorted_indices[0]]
+                best_iteration = iteration
+            
+            stop_reason = self.stop_reason(best_fitness, iteration, best_iteration, started)
             
             log_message = f"Iterasi {iteration+1}/{self.max_iterations} - Best Fitness: {best_fitness}"
             
-            if log_callback:
+            now = time.monotonic()
+            if log_callback and (last_log is None or iteration == self.max_iterations - 1 or
+                                 stop_reason or now - last_log >= self.log_interval):
                 log_callback(log_message)
+                last_log = now
+            if progress_callback:
+                progress_callback({
+                    "iteration": iteration + 1,
+                    "max_iterations": self.max_iterations,
+                    "best_fitness": best_fitness
+                })
+            if self.metrics_callback:
+                self.metrics_callback(self.iteration_metrics(
+                    iteration + 1, started, since, fitness_values, best_fitness, best_tracker
+                ))
+                since = self.timer.snapshot()
+            if stop_reason:
+                if log_callback:
+                    log_callback(f"Berhenti di iterasi {iteration+1}: {stop_reason}")
+                break
             
-            new_population = []
-            for i in range(self.population_size):
-                if random.random() < 0.05:
-                    new_solution = create_solution_function()
-                else:
-                    new_solution = self.update_position(
-                        population[i], alpha, beta, delta, a, create_solution_function, fitness_function
-                    )
-                new_population.append(new_solution)
-                fitness_values[i] = fitness_function(new_solution)
-            population = new_population
+            restarts = [self.rng.random() < 0.05 for _ in range(self.population_size)]
+            results = await self.step_population(
+                executor, population, trackers, alpha, beta, delta, a, restarts, create_solution_function
+            )
+            population = [solution for solution, _ in results]
+            trackers = [tracker for _, tracker in results]
+            fitness_values = [tracker.penalty for tracker in trackers]
             
-            await asyncio.sleep(1)
+            # Serahkan kendali ke event loop hanya bila sudah lewat yield_interval
+            if time.monotonic() - last_yield >= self.yield_interval:
+                await asyncio.sleep(0)
+                last_yield = time.monotonic()
         
+        return self.finish(best_solution, best_tracker, best_fitness, started, collect_conflicts_func, log_callback)
+
+    def finish(self, best_solution, best_tracker, best_fitness, started, collect_conflicts_func, log_callback=None):
+        polish_seconds = min(self.polish_seconds, self.remaining_time(started))
+        if polish_seconds > 0 and best_fitness > self.target_fitness:
+            with self.timer.phase('polish'):
+                best_solution, best_tracker = self.polish(best_solution, best_tracker, polish_seconds)
+            best_fitness = best_tracker.penalty
+            if log_callback:
+                log_callback(f"Pencarian lokal selesai - Best Fitness: {best_fitness}")
+
         print("Optimasi Selesai!")
         print(f"Best Fitness: {best_fitness}")
-        
-        conflicts_detail = collect_conflicts_func(best_solution)
+        # Snapshot tetap memakai data saat optimasi dimulai; beri tahu bila
+        # endpoint CRUD mengubah data master selama optimasi berjalan
+        if self.problem.data_version != problem_data.version and log_callback:
+            log_callback("Peringatan: data master berubah selama optimasi, jadwal disusun dari data lama")
+
+        with self.timer.phase('collect_conflicts'):
+            # Serigala terbaik sudah membawa daftar mata kuliah bentrok (tracker
+            # + cache); laporan rinci cukup memindai slot mata kuliah tersebut
+            temp_ids = self.fitness_cache.conflict_temp_ids(best_solution, best_tracker, self.timer)
+            conflicts_detail = collect_conflicts_func(best_solution, temp_ids)
         print(f"Detail Konflik: {conflicts_detail}")
-        conflict_numbers = set()
-        for value in conflicts_detail.values():
-            if isinstance(value, (set, list)):
-                conflict_numbers.update(map(str, value))
-        for slot in best_solution:
-            tid = str(slot.get("temp_id", ""))
-            if tid in conflict_numbers:
-                if tid in map(str, conflicts_detail.get('preference_conflict_temp_ids', [])):
-                    slot["status"] = "yellow"
-                elif tid in map(str, conflicts_detail.get('conflict_temp_ids', [])):
-                    slot["status"] = "red"
+
+        if self.metrics_callback:
+            elapsed = time.monotonic() - started
+            evaluations = self.timer.evaluations
+            self.metrics_callback({
+                "event": "summary",
+                "best_fitness": best_fitness,
+                "elapsed_seconds": round(elapsed, 6),
+                "phases": {
+                    name: {"seconds": round(seconds, 6), "calls": calls}
+                    for name, (seconds, calls) in self.timer.totals().items()
+                },
+                "evaluations": evaluations,
+                "evaluations_per_sec": round(evaluations / elapsed, 3) if elapsed > 0 else None,
+                "fitness_cache": {
+                    "hits": self.timer.counters['fitness_cache_hits'],
+                    "misses": self.timer.counters['fitness_cache_misses'],
+                    "hit_rate": self.timer.hit_rate(),
+                    "max_entries": self.fitness_cache.max_entries,
+                    # Hanya cache proses utama; worker menyimpan cache sendiri
+                    "entries": len(self.fitness_cache.entries),
+                    "memory_bytes": self.fitness_cache.memory_bytes()
+                },
+                "conflicts": {name: len(value) for name, value in conflicts_detail.items()}
+            })
                 
-        return best_solution, best_fitness
+        return schedule_to_slots(best_solution, self.problem, conflicts_detail), best_fitness
     
-    def update_position(self, current_solution, alpha, beta, delta, a, create_solution_function, fitness_function):
-        new_solution = copy.deepcopy(current_solution)
-        conflicts = collect_conflicts(new_solution, db)
-        conflict_temp_ids = conflicts.get('conflict_temp_ids', set())
+    def update_position(self, current_solution, tracker, alpha, beta, delta, a, create_solution_function):
+        conflict_temp_ids = self.fitness_cache.conflict_temp_ids(current_solution, tracker, self.timer)
         if not conflict_temp_ids:
-            return new_solution
+            return current_solution, tracker
+        # Copy-on-write: jadwal disalin sekali per serigala yang berubah,
+        # langkah yang gagal dibatalkan lewat jurnal
+        journal = ScheduleJournal(current_solution.copy(), tracker.copy())
         for tid in conflict_temp_ids:
-            indices = [i for i, slot in enumerate(new_solution) if slot.get('temp_id') == tid]
+            indices = journal.tracker.slot_index.of(tid)
             if not indices:
                 continue
-            candidate = None
-            for source in [alpha, beta, delta]:
-                source_block = [slot for slot in source if slot.get('temp_id') == tid]
-                if source_block:
-                    candidate = source_block[0]
-                    break
-            if candidate:
-                course_info = {key: candidate[key] for key in ['id_mk', 'mata_kuliah', 'id_dosen', 'dosen', 'kelas', 'sks', 'semester', 'metode', 'temp_id']}
-                temp_solution = copy.deepcopy(new_solution)
-                for idx in indices:
-                    temp_solution[idx].update({k: None for k in ['id_mk', 'mata_kuliah', 'id_dosen', 'dosen', 'kelas', 'sks', 'semester', 'metode', 'temp_id']})
-                success = any(self.schedule_course(temp_solution, course_info, relax=True) for _ in range(5))
-                if not success:
-                    success = self.schedule_course(temp_solution, course_info, force=True)
-                if success:
-                    new_solution = temp_solution
-        return new_solution
+            if any(leader.count[tid] for leader in [alpha, beta, delta]):
+                course_info = self.problem.courses[tid]
+                mark = journal.mark()
+                penalty = journal.tracker.penalty
+                journal.remove(tid, indices)
+                placed = self.follow_leaders(journal, course_info, min(indices), [alpha, beta, delta], a, penalty)
+                for _ in range(5):
+                    if placed is not None:
+                        break
+                    placed = self.schedule_course(journal, course_info, relax=True)
+                if placed is None:
+                    placed = self.schedule_course(journal, course_info, force=True)
+                if placed is None:
+                    journal.rollback(mark)
+        return journal.schedule, journal.tracker
     
-    def schedule_course(self, schedule, course, force=False, relax=False):
-        keys = ['id_mk', 'mata_kuliah', 'id_dosen', 'dosen', 'kelas', 'sks', 'semester', 'metode', 'temp_id']
-        id_mk, mata_kuliah, id_dosen, dosen, kelas, sks, semester, metode, temp_id = (course[k] for k in keys)
-        possible_positions = []
-        for i in range(len(schedule) - sks + 1):
-            block = schedule[i:i+sks]
-            if not all(slot['mata_kuliah'] is None for slot in block):
-                continue
-            if not all(slot['hari'] == block[0]['hari'] for slot in block):
+    def polish(self, schedule, tracker, time_limit):
+        # Hill climbing pada jadwal terbaik: pindah blok (geser jam / ganti ruang
+        # / ganti hari) atau tukar dengan blok lain, diterima bila penalti turun.
+        # Berhenti saat penalti 0, waktu habis, atau tidak ada langkah yang membaik.
+        deadline = time.monotonic() + time_limit
+        journal = ScheduleJournal(schedule.copy(), tracker.copy())
+        courses_by_sks = defaultdict(list)
+        for tid, course in self.problem.courses.items():
+            courses_by_sks[course['sks']].append(tid)
+        improved = True
+        while improved and journal.tracker.penalty > 0 and time.monotonic() < deadline:
+            improved = False
+            targets = journal.tracker.conflict_temp_ids(journal.schedule)
+            targets.update(np.flatnonzero(journal.tracker.tid_preference > 0).tolist())
+            targets = list(targets)
+            self.rng.shuffle(targets)
+            for tid in targets:
+                if journal.tracker.penalty <= 0 or time.monotonic() >= deadline:
+                    break
+                if self.improve_course(journal, tid, courses_by_sks):
+                    improved = True
+                    journal.changes.clear()
+        return journal.schedule, journal.tracker
+
+    def improve_course(self, journal, tid, courses_by_sks):
+        current = journal.tracker.slot_index.of(tid)
+        if not current:
+            return False
+        sks = len(current)
+        penalty = journal.tracker.penalty
+        mark = journal.mark()
+
+        # Pindah ke blok kosong lain
+        journal.remove(tid, current)
+        positions = free_block_starts(self.problem, journal.schedule, sks, max_gap=5)
+        self.rng.shuffle(positions)
+        for pos in positions:
+            step = journal.mark()
+            journal.place(tid, range(pos, pos + sks))
+            if journal.tracker.penalty < penalty:
+                return True
+            journal.rollback(step)
+        journal.rollback(mark)
+
+        # Tukar posisi dengan mata kuliah lain yang sks-nya sama
+        others = courses_by_sks[sks][:]
+        self.rng.shuffle(others)
+        for other in others:
+            other_slots = journal.tracker.slot_index.of(other)
+            if other == tid or len(other_slots) != sks:
                 continue
-            if not all(slot['ruang'] == block[0]['ruang'] for slot in block):
+            journal.remove(tid, current)
+            journal.remove(other, other_slots)
+            journal.place(tid, other_slots)
+            journal.place(other, current)
+            if journal.tracker.penalty < penalty:
+                return True
+            journal.rollback(mark)
+        return False
+
+    def follow_leaders(self, journal, course, current_pos, leaders, a, max_penalty):
+        # Langkah GWO diskret: tiap pemimpin menarik dengan koefisien A dan C.
+        # Pemimpin dengan |A| < 1 (eksploitasi) diurutkan menurut C, lalu posisi
+        # bloknya dicoba lebih dulu; |A| >= 1 berarti eksplorasi acak.
+        tid, sks = course['temp_id'], course['sks']
+        candidates = []
+        for leader in leaders:
+            A = 2 * a * self.rng.random() - a
+            C = 2 * self.rng.random()
+            if abs(A) >= 1 or not leader.count[tid]:
                 continue
-            valid = True
-            for j in range(1, len(block)):
-                diff = abs(time_to_minutes(block[j]['jam_mulai']) - time_to_minutes(block[j-1]['jam_selesai']))
-                if (not relax and diff != 0) or (relax and diff > 5):
-                    valid = False
-                    break
-            if valid:
-                possible_positions.append(i)
+            pos = min(leader.of(tid))
+            if pos != current_pos:
+                candidates.append((C, pos))
+        # Posisi pemimpin hanya diterima bila penalti tidak lebih buruk dari semula
+        for _, pos in sorted(candidates, reverse=True):
+            if self.block_fits(journal.schedule, pos, sks, max_gap=5):
+                mark = journal.mark()
+                placed = journal.place(tid, range(pos, pos + sks))
+                if journal.tracker.penalty <= max_penalty:
+                    return placed
+                journal.rollback(mark)
+        return None
+
+    def block_fits(self, schedule, pos, sks, max_gap=0):
+        problem = self.problem
+        if pos + sks > len(schedule) or not (schedule[pos:pos+sks] == EMPTY).all():
+            return False
+        if problem.slot_group[pos] != problem.slot_group[pos+sks-1]:
+            return False
+        return bool((problem.slot_gap[pos+1:pos+sks] <= max_gap).all())
+
+    def schedule_course(self, journal, course, force=False, relax=False):
+        schedule = journal.schedule
+        sks = course['sks']
+        max_gap = 5 if relax else 0
+        # Utamakan blok tanpa bentrok dosen/kelas, baru blok kosong mana pun
+        possible_positions = (
+            free_block_starts(self.problem, schedule, sks, max_gap, journal.tracker.busy_slots(course['temp_id'])) or
+            free_block_starts(self.problem, schedule, sks, max_gap)
+        )
         if possible_positions:
-            pos = random.choice(possible_positions)
-            for slot in schedule[pos:pos+sks]:
-                slot.update({k: course[k] for k in keys})
-            return True
+            pos = self.rng.choice(possible_positions)
+            return journal.place(course['temp_id'], range(pos, pos + sks))
         if force and sks == 1:
-            empty_slots = [i for i, slot in enumerate(schedule) if slot['mata_kuliah'] is None]
-            if empty_slots:
-                pos = random.choice(empty_slots)
-                schedule[pos].update({k: course[k] for k in keys})
-                return True
-        return False
+            empty_slots = np.flatnonzero(schedule == EMPTY)
+            if len(empty_slots):
+                pos = int(self.rng.choice(empty_slots))
+                return journal.place(course['temp_id'], range(pos, pos + 1))
+        return None
 
-def run_gwo_optimization(create_random_schedule_func, fitness_func, conflicts_func, pop_size, max_iter, log_callback=None):
-    gwo = GreyWolfOptimizer(population_size=pop_size, max_iterations=max_iter)
-    return gwo.optimize(fitness_func, create_random_schedule_func, conflicts_func, log_callback)
+def run_gwo_optimization(create_random_schedule_func, conflicts_func, pop_size, max_iter, db: Session, log_callback=None, workers=1, progress_callback=None, log_interval=0.0, polish_seconds=0.0,
+                         time_limit_seconds=None, target_fitness=0.0, stagnation_iterations=None,
+                         islands=1, migration_interval=10, previous_schedule=None, warm_start_ratio=0.5,
+                         seed=None, metrics_callback=None, fitness_cache_size=1024):
+    problem = ProblemSnapshot(db)
+    gwo = GreyWolfOptimizer(population_size=pop_size, max_iterations=max_iter, problem=problem,
+                            workers=workers, log_interval=log_interval, polish_seconds=polish_seconds,
+                            time_limit_seconds=time_limit_seconds, target_fitness=target_fitness,
+                            stagnation_iterations=stagnation_iterations,
+                            islands=islands, migration_interval=migration_interval, seed=seed,
+                            fitness_cache_size=fitness_cache_size)
+    if previous_schedule:
+        placements = warm_start_placements(problem, previous_schedule)
+        if log_callback:
+            log_callback(f"Warm start: {len(placements)} dari {len(problem.courses)} mata kuliah dipertahankan")
+        n_warm = max(1, int(round(pop_size * islands * warm_start_ratio)))
+        gwo.initial_solutions = [create_warm_schedule(problem, placements, gwo.rng) for _ in range(n_warm)]
+    return gwo.optimize(
+        partial(create_random_schedule_func, problem),
+        lambda sol, temp_ids=None: conflicts_func(sol, problem, temp_ids),
+        log_callback,
+        progress_callback,
+        metrics_callback
+    )
 
 if __name__ == "__main__":
     pop_size = 5  
     max_iter = 5
+    db = SessionLocal()
 
     best_schedule, best_fitness = asyncio.run(run_gwo_optimization(
             create_random_schedule,
-            lambda sol: calculate_fitness(sol, db),
-            lambda sol: collect_conflicts(sol, db),
+            collect_conflicts,
             pop_size,
             max_iter,
+            db,
             log_callback=lambda msg: print(msg))  # Optional logging
         )
     
@@ -482,7 +1558,7 @@ if __name__ == "__main__":
     total_terisi = sum(1 for slot in best_schedule if slot['mata_kuliah'] is not None)
     print(f"Total slot terisi: {total_terisi}")
     
-    total_sks = merged_df['sks'].sum()
+    total_sks = problem_data.get(db).merged_df['sks'].sum()
     print("Jadwal Sudah Lengkap" if total_terisi == total_sks else "Jadwal Belum Lengkap")
     
     with open('backend/output.json', 'w') as f:
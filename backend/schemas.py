@@ -84,7 +84,18 @@ class PreferensiSchema(BaseModel):
 
 class ScheduleRequest(BaseModel):
     population_size: int = Field(..., gt=3, lt=101, description="Population size harus antara 4-100")
-    max_iterations: int = Field(..., gt=3, lt=101, description="Max iterations harus antara 4-100")
+    max_iterations: int = Field(..., gt=3, lt=1001, description="Max iterations harus antara 4-1000")
+    workers: int = Field(1, gt=0, lt=33, description="Jumlah proses worker harus antara 1-32")
+    polish_seconds: float = Field(0, ge=0, le=300, description="Durasi pencarian lokal harus antara 0-300 detik")
+    time_limit_seconds: Optional[float] = Field(None, gt=0, le=3600, description="Batas waktu harus antara 0-3600 detik")
+    target_fitness: float = Field(0, ge=0, description="Target fitness tidak boleh negatif")
+    stagnation_iterations: Optional[int] = Field(None, gt=0, description="Iterasi tanpa perbaikan harus lebih dari 0")
+    islands: int = Field(1, gt=0, lt=33, description="Jumlah pulau harus antara 1-32")
+    migration_interval: int = Field(10, gt=0, lt=1001, description="Interval migrasi harus antara 1-1000 iterasi")
+    warm_start: bool = False
+    warm_start_ratio: float = Field(0.5, gt=0, le=1, description="Porsi populasi warm start harus antara 0-1")
+    seed: Optional[int] = Field(None, ge=0, description="Seed tidak boleh negatif")
+    fitness_cache_size: int = Field(1024, ge=0, le=100000, description="Ukuran cache fitness harus antara 0-100000")
 
 class ProdiScemas(BaseModel):
     id: int